@@ -1,18 +1,36 @@
+import argparse
+import datetime
 import json
 import os
 import time
 import threading
-import tkinter as tk
-
-from api_caller import APICaller
-from gui import GameDurationsDisplay
+from collections import deque
+
+from api_caller import CLIENT_OFFLINE, APICaller
+from board_diff import SplitTracker
+from champion_stats import ChampionStatsTable
+from deck_resolver import DeckResolver
+from log_service import RATE_LIMITED, REPEAT_BY_TEMPLATE, LogService, get_logger, parse_levels
+from event_bus import ChampionDetected, EventBus, RunCompleted, RunsImported, StateChanged, TimersChanged, TimersReset
+from metrics import REGISTRY, MetricsServer
+from poll_scheduler import PollScheduler
+from run_journal import RunJournal, user_data_path
+from transition_estimator import TransitionEstimator
 
 class GameState:
     MENU = "Menus"
     IN_PROGRESS = "InProgress"
+    OFFLINE = CLIENT_OFFLINE  # the client API stopped answering
+
+# How long the deck can be gone (on top of the loop count) before we assume the player left the adventure
+DECK_MISSING_GRACE = 1.5
 
 class LoRTimers:
-    def __init__(self, api_caller, stop_event, data_folder="Data"):
+    def __init__(self, api_caller, stop_event, data_folder="Data", journal=None, time_source=time.time,
+                 metrics=REGISTRY, event_bus=None, deck_resolver=None, split_tracker=None, log_name="tracker"):
+        self.log = get_logger(log_name)
+        # Every timer reads the clock through here so sessions can be replayed on simulated time
+        self.time_source = time_source
         self.deck_missing_count = None
 
         self.previous_game_ID = None
@@ -22,11 +40,15 @@ class LoRTimers:
         self.previous_game_result = None
 
         self.api_caller = api_caller
+        # The tracker only ever looks at GameState, so the board never gets decoded for it
+        api_caller.subscribe_fields(APICaller.GAME_DATA, self, ("GameState",))
 
         self.current_champion = None
         self.previous_champion = None
 
         self.champion_mapping = self.load_champion_mapping(data_folder)
+        # Trackers in one process can share a resolver (and its card data)
+        self.deck_resolver = deck_resolver or DeckResolver(self.champion_mapping, data_folder)
 
         self.previous_game_ID = None  # Track previous game ID
         self.previous_game_state = None  # Track previous game state
@@ -40,75 +62,140 @@ class LoRTimers:
         self.champion_start_time = None
         self.menu_duration = 0
         self.champion_duration = 0
-        self.game_durations = {}
+        self.journal = journal
+        self.game_durations = journal.load() if journal else {}
+        if journal:
+            self.champion_stats = ChampionStatsTable.load(journal.stats_path, self.game_durations)
+            journal.stats_source = self.champion_stats.to_dict
+        else:
+            self.champion_stats = ChampionStatsTable.from_durations(self.game_durations)
 
         self.pending_champion_time = None
+        self.carried_time = 0.0  # time from lost games folded into the current run
+        self.paused_champion_time = None  # champion time when the client went offline mid-game
+        self.run_games = 0  # games of the current run already finished (all of them lost)
+        self.menu_paused = False  # menu timer was running when the client went offline
+
+        # Optional per-round/per-action splits from the board; they need the whole board payload
+        self.split_tracker = split_tracker
+        self.run_splits = []
+        if split_tracker is not None:
+            api_caller.subscribe_fields(APICaller.GAME_DATA, split_tracker, ("Screen", "Rectangles"))
 
         self.deck = None
         self.previous_deck = None
         self.deck_missing_count = 0
+        self.deck_missing_since = None
+        self.deck_updated = False
         self.clock = None
 
+        # Timers stamp transitions with event_time: the bracketed estimate of when the
+        # change really happened (see TransitionEstimator), or the tick time otherwise
+        self.transitions = TransitionEstimator()
+        self.event_time = None
+        self.event_error = 0.0
+        self.champion_error = 0.0
+
+        # Everything other threads need goes out as events; nothing reads our fields directly
+        self.event_bus = event_bus if event_bus is not None else EventBus()
+        self.published_champion = None
+        self.published_timers = None
+        self.restart_requested = False
+        self.pending_imports = deque()  # batches of imported runs waiting for the polling thread
+
+        self.tick_duration = metrics.histogram("loop.tick_duration")
+        self.tick_lag = metrics.histogram("loop.lag")
+        self.tick_started = None
+        self.tick_clock = None
+        self.next_tick = None
+
+        # Endpoints to fetch on the next tick (None fetches all of them)
+        self.poll_endpoints = None
+        self.last_changes = (False, False, False)
+        self.scheduler = PollScheduler(
+            endpoints=APICaller.ENDPOINTS,
+            # While offline the API caller's own backoff decides when to knock again
+            state_intervals={GameState.IN_PROGRESS: 0.5, GameState.MENU: 0.5, GameState.OFFLINE: 1.0},
+            endpoint_intervals={
+                APICaller.GAME_DATA: None,  # game state drives everything, fetch every tick
+                APICaller.DECK: 2.0,
+                APICaller.GAME_RESULT: 10.0,  # only really changes around transitions
+            },
+        )
+
     @property
     def current_champion_time(self):
         """Returns the currently running champion timer duration."""
         if self.champion_start_time:
-            return time.time() - self.champion_start_time
+            return self.time_source() - self.champion_start_time
         return self.champion_duration  # If stopped, return last recorded time
 
     @property
     def total_menu_time(self):
         """Returns the total menu duration."""
         if self.menu_start_time:
-            return self.menu_duration + (time.time() - self.menu_start_time)
+            return self.menu_duration + (self.time_source() - self.menu_start_time)
         return self.menu_duration
 
     def load_champion_mapping(self, data_folder):
         """Load champion mapping from JSON file."""
         champion_mapping_path = os.path.join(data_folder, "champion_mapping.json")
         if not os.path.exists(champion_mapping_path):
-            print(f"[ERROR] Champion mapping file '{champion_mapping_path}' not found.")
+            self.log.error("Champion mapping file '%s' not found.", champion_mapping_path)
             return {}
 
         with open(champion_mapping_path, "r", encoding="utf-8") as f:
             try:
                 return json.load(f)
             except json.JSONDecodeError:
-                print("[ERROR] Could not decode champion mapping JSON.")
+                self.log.error("Could not decode champion mapping JSON.")
                 return {}
 
     def determine_champion_from_deck(self):
         """Determine the champion being played from the static decklist."""
         if self.deck is None:
-            print("[WARNING] No deck data available. Champion cannot be determined.")
+            self.log.warning("No deck data available. Champion cannot be determined.")
             return
-        for card_code in self.deck.keys():
-            if card_code in self.champion_mapping:
-                found = self.champion_mapping[card_code]
-                if self.current_champion == found:
-                    # dont need to do anything
-                    return
-                else:
-                    print("[Info] Updated previous champion")
-                    self.previous_champion = self.current_champion
-                self.current_champion = found
-                print(f"[INFO] Champion detected: {self.current_champion}")
-                self.deck_missing_count = 0
-                return  # Stop iterating after the first champion is found
 
-        print("[WARNING] No champion found in deck'.")
+        found = self.deck_resolver.resolve(self.deck, self.api_caller.fingerprint(APICaller.DECK))
+        if found is None:
+            self.log.warning("No champion found in deck.")
+            return
+
+        if self.current_champion == found:
+            # dont need to do anything
+            return
+        self.log.debug("Updated previous champion")
+        self.previous_champion = self.current_champion
+        self.current_champion = found
+        self.log.info("Champion detected: %s", self.current_champion)
+        self.deck_missing_count = 0
 
     def update_fields(self):
 
-        self.clock = time.time()
-        self.api_caller.update_all_data()
-        self.player_won = self.api_caller.game_result.get("LocalPlayerWon", None)
-        self.game_id = self.api_caller.game_result.get("GameID", None)
+        self.clock = self.time_source()
+        self.api_caller.update_all_data(self.poll_endpoints)
+        for endpoint, window in self.api_caller.observed_at.items():
+            self.transitions.observe(endpoint, window)
+        self.event_time = self.clock
+        self.event_error = 0.0
+
+        # Only pick up objects the API caller actually republished this tick
+        changed = self.api_caller.changed
+        if changed[APICaller.GAME_RESULT]:
+            self.player_won = self.api_caller.game_result.get("LocalPlayerWon", None)
+            self.game_id = self.api_caller.game_result.get("GameID", None)
 
         self.previous_deck = self.deck
-        self.deck = self.api_caller.get_deck()
+        self.deck_updated = changed[APICaller.DECK]
+        if self.deck_updated:
+            self.deck = self.api_caller.get_deck()
 
-        self.current_state = self.api_caller.get_game_state()
+        if changed[APICaller.GAME_DATA]:
+            self.current_state = self.api_caller.get_game_state()
+            if self.split_tracker is not None and self.champion_start_time \
+                    and self.current_state == GameState.IN_PROGRESS:
+                self.split_tracker.update(self.api_caller.game_data, self.clock)
 
 
     def track_state_changes(self):
@@ -118,11 +205,22 @@ class LoRTimers:
         # Detect changes
         state_changed = self.current_state != self.previous_game_state
         game_id_changed = self.game_id is not None and self.game_id != self.previous_game_ID
-        deck_changed = self.deck != self.previous_deck
+        # Skip the deep compare when the decklist payload was byte-for-byte the same
+        deck_changed = self.deck_updated and self.deck != self.previous_deck
+
+        # Stamp timers with when the change happened rather than when we noticed it
+        if state_changed:
+            if GameState.OFFLINE in (self.current_state, self.previous_game_state):
+                self.stamp_outage()
+            else:
+                self.stamp_transition(APICaller.GAME_DATA)
+        elif game_id_changed:
+            self.stamp_transition(APICaller.GAME_RESULT)
 
         # Log detected changes
         if state_changed:
-            print(f"[Tracker] Game state changed: {self.previous_game_state} -> {self.current_state}")
+            self.log.info("Game state changed: %s -> %s", self.previous_game_state, self.current_state)
+            self.event_bus.publish(StateChanged(self.previous_game_state, self.current_state))
 
             # start champ timers right away
             if self.current_champion and self.current_state == GameState.IN_PROGRESS:
@@ -130,8 +228,8 @@ class LoRTimers:
 
 
         if game_id_changed:
-            print(f"[Tracker] GameID changed: {self.previous_game_ID} -> {self.game_id}")
-            print(f"[Tracker] player won: {self.player_won}")
+            self.log.info("GameID changed: %s -> %s (player won: %s)", self.previous_game_ID, self.game_id,
+                          self.player_won)
             if self.player_won is not None:
                 self.start_menu_timer()
             if self.previous_game_ID is not None:
@@ -139,22 +237,58 @@ class LoRTimers:
                 self.deck_missing_count = 0
 
         if deck_changed:
-            print("[Handled] Deck changed")
+            self.log.debug("Deck changed")
             self.determine_champion_from_deck()
 
-
+        self.last_changes = (state_changed, game_id_changed, deck_changed)
         return state_changed, game_id_changed, deck_changed
 
+    def stamp_transition(self, endpoint):
+        """Use the bracketed transition time from an endpoint's last two polls for this tick's timers."""
+        estimate = self.transitions.estimate(endpoint)
+        if estimate is not None:
+            self.event_time, self.event_error = estimate
+
+    def stamp_outage(self):
+        """Stamp the client going away or coming back from the circuit breaker's own bracket.
+
+        Poll windows from before an outage must never bracket a change seen after
+        it (that would put the resume halfway through the outage), so the
+        estimator starts over when the client goes offline.
+        """
+        health = self.api_caller.health
+        if self.current_state == GameState.OFFLINE:
+            self.transitions.forget()
+            lower, upper = health.last_success, health.failing_since
+        else:
+            # Between the last unanswered probe and the first answer
+            lower = health.last_failure
+            upper = self.transitions.current.get(APICaller.GAME_DATA, (None, self.clock))[1]
+        if lower is not None and upper is not None and lower <= upper:
+            self.event_time, self.event_error = (lower + upper) / 2, (upper - lower) / 2
+
     def handle_timers(self, state_changed, game_id_changed, deck_changed):
         """Handles timers based on tracked changes but does NOT modify state tracking variables."""
 
-        if state_changed and self.previous_game_state == GameState.IN_PROGRESS:
-            print("[INFO] Game ended. Transitioning to menu...")
+        if state_changed and self.current_state == GameState.OFFLINE:
+            self.log.info("Client offline. Pausing timers...")
+            self.pause_timers()
+
+        elif state_changed and self.previous_game_state == GameState.OFFLINE:
+            self.log.info("Client back. Resuming timers...")
+            if self.current_state == GameState.IN_PROGRESS:
+                self.start_champion_timer()
+            elif self.menu_paused:
+                self.start_menu_timer()
+            self.menu_paused = False
+
+        elif state_changed and self.previous_game_state == GameState.IN_PROGRESS:
+            self.log.info("Game ended. Transitioning to menu...")
             self.start_menu_timer()
 
         # Transition: MENU → IN-GAME (New Game Started)
         elif state_changed and self.previous_game_state == GameState.MENU and self.current_state == GameState.IN_PROGRESS:
-            print("[INFO] Entering a game...")
+            self.log.info("Entering a game...")
             self.start_champion_timer()
 
         elif state_changed and self.current_state == GameState.IN_PROGRESS and self.previous_game_state is None:
@@ -165,62 +299,128 @@ class LoRTimers:
     def start_champion_timer(self):
         """Start champion timer and ensure the menu timer stops."""
         # Starting champion timer should always stop menu timer
-        clock = self.clock
+        clock = self.event_time
         if self.menu_start_time:
             self.stop_menu_timer()
 
         if not self.champion_start_time:
-            print(f"[TIMER] Champion timer started for {self.current_champion}.")
+            self.log.info("Champion timer started for %s.", self.current_champion)
             self.champion_start_time = clock
+            self.champion_error += self.event_error
+            if self.split_tracker is not None:
+                self.split_tracker.start(clock)
 
             # Restore pending time if a loss happened before
             if self.pending_champion_time:
-                print(f"[INFO] Restoring {self.pending_champion_time:.2f} sec from previous loss.")
+                self.log.info("Restoring %.2f sec from previous loss.", self.pending_champion_time)
                 self.champion_start_time -= self.pending_champion_time  # Offset start time
+                self.champion_duration = 0  # the offset start time already counts it
+                self.carried_time = self.pending_champion_time
                 self.pending_champion_time = None  # Clear pending time
 
+            # Pick up where we were before the client went away; this is the same game, not a carry
+            if self.paused_champion_time:
+                self.log.info("Resuming %.2f sec from before the client went offline.", self.paused_champion_time)
+                self.champion_start_time -= self.paused_champion_time
+                self.champion_duration = 0
+                self.paused_champion_time = None
+
 
     def stop_champion_timer(self):
         """Stop champion timer, store the time, and decide what to do next."""
         if self.champion_start_time:
-            session_duration = self.clock - self.champion_start_time
+            session_duration = self.event_time - self.champion_start_time
             self.champion_duration += session_duration
+            self.champion_error += self.event_error
             self.champion_start_time = None
-            print(f"[TIMER] {self.current_champion} session ended. Duration: {self.champion_duration:.2f} sec")
+            if self.split_tracker is not None:
+                self.run_splits.append(self.split_tracker.finish(self.event_time))
+            self.log.info("%s session ended. Duration: %.2f sec", self.current_champion, self.champion_duration)
 
             if self.current_champion:
                 if self.player_won:
                     # Save duration to game session list if won
-                    print(f"[Saving] {self.current_champion} time for game {self.game_id}.")
-                    self.game_durations.setdefault(self.current_champion, []).append(
-                        {"duration": self.champion_duration})
+                    self.log.info("Saving %s time for game %s.", self.current_champion, self.game_id)
+                    record = {
+                        "timestamp": datetime.datetime.fromtimestamp(self.event_time).isoformat(),
+                        "duration": self.champion_duration,
+                        "game_id": self.game_id,
+                        "error": self.champion_error,
+                        "carried": self.carried_time,
+                    }
+                    if self.split_tracker is not None:
+                        # One list of rounds per game of the run, losses included
+                        record["splits"] = self.run_splits
+                        self.run_splits = []
+                    self.game_durations.setdefault(self.current_champion, []).append(record)
+                    self.champion_stats.record(self.current_champion, self.champion_duration)
+                    if self.journal:
+                        self.journal.append(self.current_champion, record)
+                    self.event_bus.publish(RunCompleted(self.current_champion, record))
                     self.champion_duration = 0  # Reset for next game
+                    self.champion_error = 0.0
+                    self.carried_time = 0.0
+                    self.run_games = 0
                 else:
                     # If lost, carry over duration to the next session
-                    print(f"[INFO] Loss detected. Carrying {self.champion_duration:.2f} sec to next game.")
+                    self.log.info("Loss detected. Carrying %.2f sec to next game.", self.champion_duration)
                     self.pending_champion_time = self.champion_duration  # Store for next round
+                    self.run_games += 1
         else:
-            print("[ERROR] champion timer stopped with no champion.]")
+            self.log.error("Champion timer stopped with no champion.")
 
     def start_menu_timer(self):
         """Start menu timer and ensure the champion timer stops."""
         # Starting menu timer should always stop champion timer
-        clock = self.clock
+        clock = self.event_time
         if self.champion_start_time:
             self.stop_champion_timer()
 
         if not self.menu_start_time:
-            print("[TIMER] Menu timer started.")
+            self.log.info("Menu timer started.")
             self.menu_start_time = clock
 
+    def pause_timers(self):
+        """Stop both timers without saving anything; the champion time resumes on the next start."""
+        if self.champion_start_time:
+            self.champion_duration += self.event_time - self.champion_start_time
+            self.champion_start_time = None
+            self.paused_champion_time = self.champion_duration
+            self.log.info("%s timer paused at %.2f sec", self.current_champion, self.paused_champion_time)
+        self.menu_paused = self.menu_start_time is not None
+        self.stop_menu_timer()
+
     def stop_menu_timer(self):
         """Stop menu timer and add the duration to total menu time."""
         if self.menu_start_time:
-            self.menu_duration += self.clock - self.menu_start_time
+            self.menu_duration += self.event_time - self.menu_start_time
             self.menu_start_time = None
-            print(f"[TIMER] Menu session ended. Total menu time: {self.menu_duration:.2f} sec")
+            self.log.info("Menu session ended. Total menu time: %.2f sec", self.menu_duration)
 
     def update_game_state(self):
+        """Run one tick and publish whatever it changed."""
+        if self.restart_requested:
+            self.restart_requested = False
+            self.restart_timer()
+        while self.pending_imports:
+            self.add_imported_runs(self.pending_imports.popleft())
+        self._update_game_state()
+        self.publish_changes()
+
+    def publish_changes(self):
+        """Publish champion and timer changes since the last tick."""
+        if self.current_champion != self.published_champion:
+            self.published_champion = self.current_champion
+            self.event_bus.publish(ChampionDetected(self.current_champion))
+
+        timers = TimersChanged(self.champion_start_time, self.champion_duration,
+                               self.menu_start_time, self.menu_duration, self.run_games,
+                               self.pending_champion_time or self.carried_time)
+        if timers != self.published_timers:
+            self.published_timers = timers
+            self.event_bus.publish(timers)
+
+    def _update_game_state(self):
         """Update game state and track champion selection across different game phases."""
         if self.stop_event.is_set():
             return
@@ -229,24 +429,28 @@ class LoRTimers:
 
 
         if state_changed:
-            print(f"[Handle] Game state changed: {self.previous_game_state} -> {self.current_state}")
+            self.log.debug("Handling game state change: %s -> %s", self.previous_game_state, self.current_state)
 
             # TODO add any menu state change handling
             self.handle_timers(state_changed, game_id_changed, deck_changed)
 
             self.previous_game_state = self.current_state
 
+        # Nothing to watch until the client is back, least of all the missing deck
+        if self.current_state == GameState.OFFLINE:
+            return
+
         # we are waiting because of the menu pause after winning or losing a game
         if self.pause and self.deck is None:
             # start menu timer if it isnt already
             self.start_menu_timer()
-            print("In a loading/victory screen")
+            self.log.info("In a loading/victory screen", extra=RATE_LIMITED)
             return
         else:
             self.pause = False
 
         if game_id_changed:
-            print(f"[Handle] GameID changed: {self.previous_game_ID} -> {self.game_id}")
+            self.log.debug("Handling GameID change: %s -> %s", self.previous_game_ID, self.game_id)
 
             # this is specifically the case that we were in a game when the game updates
 
@@ -265,44 +469,112 @@ class LoRTimers:
                 self.pause = True
                 return
 
-        if self.deck is None and self.current_champion:
+        if self.deck is not None:
+            self.deck_missing_count = 0
+            self.deck_missing_since = None
+        elif self.current_champion:
+            if self.deck_missing_count == 0:
+                self.deck_missing_since = self.clock
             self.deck_missing_count += 1
-            print(f"[INFO] Deck is missing ({self.deck_missing_count} loops).")
+            self.log.info("Deck is missing (%d loops).", self.deck_missing_count, extra=REPEAT_BY_TEMPLATE)
 
             # this number is expirimental think of it like the watchdog for resetting everything
-            if self.deck_missing_count >= 3:
-                print("[WARNING] Deck has been missing for too long. Assuming player left adventure.")
+            # the grace period keeps burst polling from tripping it early
+            if self.deck_missing_count >= 3 and self.clock - self.deck_missing_since >= DECK_MISSING_GRACE:
+                self.log.warning("Deck has been missing for too long. Assuming player left adventure.")
                 self.previous_champion = self.current_champion
                 self.current_champion = None
                 self.waiting_for_deck = False
                 self.pause = False
                 self.champion_start_time = None
-                self.champion_duration = 0  # Reset invalid champion times
+                self.deck_missing_count = 0
+                self.deck_missing_since = None
+                self.reset_run()  # Reset invalid champion times
                 self.start_menu_timer()
             return
 
+    def needs_fast_polling(self):
+        """True while something is in flux and transitions should be caught quickly."""
+        return (any(self.last_changes) or self.waiting_for_deck or self.pause
+                or (self.deck_missing_count > 0 and self.current_champion is not None))
+
+    def begin_tick(self):
+        """Start a scheduled tick: note loop lag and return the endpoints due this tick."""
+        self.tick_started = time.perf_counter()
+        if self.next_tick is not None:
+            # How late this tick is compared to when the scheduler wanted it
+            self.tick_lag.observe(max(0.0, self.tick_started - self.next_tick))
+
+        self.tick_clock = self.time_source()
+        self.poll_endpoints = self.scheduler.due_endpoints(self.tick_clock)
+        self.last_changes = (False, False, False)
+        return self.poll_endpoints
+
+    def end_tick(self):
+        """Finish a scheduled tick and return how many seconds to wait before the next one."""
+        self.scheduler.mark_polled(self.poll_endpoints, self.tick_clock)
+
+        # riot recomends no more then 1 per sec but I have done 0.001 and been completely okay,
+        # the scheduler only goes fast around transitions and backs off when nothing happens
+        now = self.time_source()
+        self.scheduler.observe(now, self.current_state, self.needs_fast_polling())
+        wait = max(0.0, self.scheduler.interval(now) - (now - self.tick_clock))
+
+        tick_finished = time.perf_counter()
+        self.tick_duration.observe(tick_finished - self.tick_started)
+        self.next_tick = tick_finished + wait
+        return wait
+
     def run_game_loop(self):
         """Runs the main game loop continuously until stopped."""
         while not self.stop_event.is_set():
+            self.begin_tick()
             self.update_game_state()
-
-            # TODO update sleep as prefer although riot recomends no more then 1 per sec
-            # but I have done 0.001 and been completely okay
-            time.sleep(0.5)
+            self.stop_event.wait(self.end_tick())
 
     def stop(self):
         """Stops the loop and exits the application."""
-        print("[INFO] Stopping application...")
+        self.log.info("Stopping application...")
         self.stop_event.set()
 
+    def request_restart(self):
+        """Ask the polling thread to restart the timers on its next tick (safe from any thread)."""
+        self.restart_requested = True
+
+    def reset_run(self):
+        """Forget the run in progress: its time, lost games, paused time and splits."""
+        self.champion_duration = 0
+        self.pending_champion_time = None
+        self.paused_champion_time = None
+        self.champion_error = 0.0
+        self.carried_time = 0.0
+        self.run_games = 0
+        self.run_splits = []
+        if self.split_tracker is not None:
+            self.split_tracker.finish(self.time_source())
+
+    def import_runs(self, runs):
+        """Queue imported runs, [(champion, record), ...], for the polling thread to save (safe from any thread)."""
+        self.pending_imports.append(list(runs))
+
+    def add_imported_runs(self, runs):
+        """Add imported runs to the history, the stats and the journal, then announce them."""
+        for champion, record in runs:
+            self.game_durations.setdefault(champion, []).append(record)
+            self.champion_stats.record(champion, record["duration"])
+            if self.journal:
+                self.journal.append(champion, record)
+        self.event_bus.publish(RunsImported(runs))
+
     def restart_timer(self):
         # need to clear all current saved timer variables
         self.menu_start_time = None
         self.champion_start_time = None
         self.menu_duration = 0
-        self.champion_duration = 0
-        self.pending_champion_time = 0
-        self.clock = time.time()
+        self.reset_run()
+        self.clock = self.time_source()
+        self.event_time = self.clock
+        self.event_error = 0.0
 
         if self.current_state == GameState.IN_PROGRESS:
             self.champion_start_time = self.clock
@@ -310,31 +582,111 @@ class LoRTimers:
         if self.current_state == GameState.MENU:
             self.menu_start_time = self.clock
             self.start_menu_timer()
+        self.event_bus.publish(TimersReset())
 
 if __name__ == "__main__":
+    import tkinter as tk
+
+    from gui import GameDurationsDisplay
+
+    parser = argparse.ArgumentParser(description="Track Path of Champions run times.")
+    parser.add_argument("--record", metavar="PATH", help="Record every client response to a session file")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve read-only metrics as JSON on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--overlay-port", type=int, metavar="PORT",
+                        help="Push live timers to stream overlays at http://127.0.0.1:PORT/ (Server-Sent Events)")
+    parser.add_argument("--log-level", default="INFO", help="Default log level (DEBUG, INFO, WARNING, ERROR)")
+    parser.add_argument("--log-levels", type=parse_levels, default={}, metavar="COMPONENT=LEVEL,...",
+                        help="Per-component levels, e.g. api=WARNING,tracker=DEBUG")
+    parser.add_argument("--log-file", help="Also write the log to this (rotated) file")
+    parser.add_argument("--data-file", metavar="PATH",
+                        help="Where completed runs are saved (default: game_durations.json in the user data folder)")
+    parser.add_argument("--separate-process", action="store_true",
+                        help="Poll the client from its own process so parsing and the GUI never stall each other")
+    parser.add_argument("--splits", action="store_true",
+                        help="Record per-round and per-action splits from the board (parses the full board payload)")
+    args = parser.parse_args()
+    data_file = args.data_file or user_data_path("game_durations.json")
+
+    log_service = LogService(args.log_level.upper(), args.log_levels, path=args.log_file).start()
+    log = get_logger("app")
     stop_event = threading.Event()  # Shared stop event between game logic and GUI
-    api = APICaller(None, None)
-    game = LoRTimers(api, stop_event)
-
-    # Start game state loop in a separate thread
-    game_thread = threading.Thread(target=game.run_game_loop, daemon=True)
-    game_thread.start()
+    event_bus = EventBus()
+    poller = game = api = journal = recorder = None
+    if args.separate_process:
+        # The tracker, its journal and its metrics live in the poller process; we only
+        # see its timer state (shared memory) and completed runs (pipe) as events
+        from poller_process import PollerProcess
+        poller = PollerProcess(event_bus, log_level=args.log_level.upper(), log_levels=args.log_levels,
+                               metrics_port=args.metrics_port, record=args.record, splits=args.splits,
+                               journal=data_file)
+        game_durations = poller.start()
+        champion_stats = None
+        reset_timers = poller.request_restart
+        clear_mapping = poller.clear_mapping
+        import_runs = poller.import_runs
+        remote_metrics = poller.metrics
+    else:
+        api = APICaller(None, None)
+        if args.metrics_port:
+            MetricsServer(port=args.metrics_port).start()
+        if args.record:
+            from session_replay import SessionRecorder
+            recorder = SessionRecorder(args.record)
+            api.recorder = recorder
+        journal = RunJournal(data_file)
+        game = LoRTimers(api, stop_event, journal=journal, event_bus=event_bus,
+                         split_tracker=SplitTracker() if args.splits else None)
+        game_durations = game.game_durations
+        champion_stats = game.champion_stats
+        reset_timers = game.request_restart  # ✅ Restart happens on the game thread
+        clear_mapping = game.champion_mapping.clear
+        import_runs = game.import_runs
+        remote_metrics = None
+    overlay = None
+    if args.overlay_port:
+        from overlay_server import OverlayServer
+        overlay = OverlayServer(event_bus, game_durations, port=args.overlay_port).start()
 
     # Initialize GUI
     root = tk.Tk()
-    # Bind Escape key to stop
-    root.bind("<Escape>", lambda event: game.stop())
-    root.protocol("WM_DELETE_WINDOW", game.stop)  # Handle window close event
+    # F12 writes the recent log to disk, handy when reporting a timing glitch
+    root.bind("<F12>", lambda event: log.info("Wrote %d recent log lines to %s",
+                                              log_service.dump("lor_timers_recent.log"), "lor_timers_recent.log"))
 
+    # The GUI subscribes before the game thread starts so it sees every event
     gui = GameDurationsDisplay(
         root=root,
-        game_durations=game.game_durations,
-        get_current_deck=lambda: game.current_champion,
-        get_current_champion_time=lambda: game.current_champion_time,  # ✅ New
-        get_menu_time=lambda: game.total_menu_time,  # ✅ New
+        game_durations=game_durations,
+        champion_stats=champion_stats,
+        event_bus=event_bus,
         stop_event=stop_event,
-        clear_data=lambda: game.champion_mapping.clear(),
+        clear_data=clear_mapping,
         champion_data={},
-        reset_timers = game.restart_timer  # ✅ Pass reset_timers from LoRTimers
+        reset_timers=reset_timers,
+        import_runs=import_runs,
+        remote_metrics=remote_metrics
     )
+
+    if poller:
+        def pump_poller():
+            if not stop_event.is_set():
+                poller.poll()
+                root.after(50, pump_poller)
+        pump_poller()
+    else:
+        # Start game state loop in a separate thread
+        game_thread = threading.Thread(target=game.run_game_loop, daemon=True)
+        game_thread.start()
+
     gui.run()  # Run the GUI
+    if poller:
+        poller.stop()
+    else:
+        api.close()
+        journal.close()
+    if recorder:
+        recorder.close()
+    if overlay:
+        overlay.stop()
+    log_service.stop()
@@ -1,14 +1,91 @@
+import hashlib
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from json.decoder import scanstring
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from client_health import ClientHealth
+from log_service import RATE_LIMITED, get_logger
+from metrics import REGISTRY
+
+# Returned instead of a parsed payload when an endpoint sent exactly the same bytes as last time
+UNCHANGED = object()
+# Game state reported while the client can't be reached
+CLIENT_OFFLINE = "Offline"
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def decode_fields(text, fields):
+    """Decode only `fields` from a top-level JSON object.
+
+    Members are read in order and parsing stops as soon as every wanted field
+    has been seen, so anything after them (the Rectangles array sits at the
+    end of positional-rectangles) is never decoded or even scanned. Members
+    before a wanted field still have to be decoded to find where they end.
+    Payloads that aren't an object are decoded in full.
+    """
+    skip = _WHITESPACE.match
+    position = skip(text, 0).end()
+    if not text.startswith("{", position):
+        return json.loads(text)
+    result = {}
+    remaining = set(fields)
+    position = skip(text, position + 1).end()
+    if text.startswith("}", position):
+        return result
+    while remaining:
+        if not text.startswith('"', position):
+            raise ValueError(f"Expected a member name at position {position}")
+        key, position = scanstring(text, position + 1)
+        position = skip(text, position).end()
+        if not text.startswith(":", position):
+            raise ValueError(f"Expected ':' at position {position}")
+        value, position = _DECODER.raw_decode(text, skip(text, position + 1).end())
+        if key in remaining:
+            result[key] = value
+            remaining.discard(key)
+        position = skip(text, position).end()
+        if text.startswith("}", position):
+            break
+        if not text.startswith(",", position):
+            raise ValueError(f"Expected ',' or '}}' at position {position}")
+        position = skip(text, position + 1).end()
+    return result
+
 
 class APICaller:
-    def __init__(self, game_durations, refresh_display_callback):
+    GAME_DATA = "game_data"
+    DECK = "deck"
+    GAME_RESULT = "game_result"
+    ENDPOINTS = (GAME_DATA, DECK, GAME_RESULT)
+    # Smallest payload, so it's what we knock with while the client is offline
+    PROBE_ENDPOINT = GAME_RESULT
+
+    def __init__(self, game_durations, refresh_display_callback, concurrent=True, timeout=1,
+                 base_url="http://127.0.0.1:21337", metrics=REGISTRY, time_source=time.time, log_name="api"):
+        self.log = get_logger(log_name)
         self.game_durations = game_durations
         self.refresh_display_callback = refresh_display_callback
 
         # API Endpoints
-        self.game_data_link = "http://127.0.0.1:21337/positional-rectangles"
-        self.deck_link = "http://127.0.0.1:21337/static-decklist"
-        self.game_result_link = "http://127.0.0.1:21337/game-result"
+        self.base_url = base_url.rstrip("/")
+        self.game_data_link = f"{self.base_url}/positional-rectangles"
+        self.deck_link = f"{self.base_url}/static-decklist"
+        self.game_result_link = f"{self.base_url}/game-result"
+
+        # Connection handling: one keep-alive session shared by every endpoint,
+        # and a small pool so the three requests of a tick go out together
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=3))
+        self.concurrent = concurrent
+        self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="lor-fetch") if concurrent else None
 
         # Data Storage
         self.game_data = {}
@@ -21,61 +98,258 @@ class APICaller:
         self.previous_game_state = None  # NEW: Track previous state
         self.deck_loaded = False  # NEW: Track if deck has been detected
 
-    def fetch_game_data(self):
-        """Fetch live positional-rectangles game data."""
+        # Change detection: fingerprint of the last raw payload per endpoint, and
+        # whether the last update published a new object for it
+        self._fingerprints = {}
+        self.changed = dict.fromkeys(self.ENDPOINTS, False)
+
+        # Fields each consumer reads from an endpoint's payload (None means all of it);
+        # endpoints nobody subscribed to are decoded in full
+        self.field_subscriptions = {name: {} for name in self.ENDPOINTS}
+
+        # (sent, received) times of each endpoint's successful poll during the last update
+        self.time_source = time_source
+        self.observed_at = {}
+
+        # Circuit breaker: while the client is unreachable only one backed-off probe goes out
+        self.health = ClientHealth()
+        self._unreachable = {}
+
+        # Optional SessionRecorder; gets every new raw payload once per tick
+        self.recorder = None
+        self._tick_payloads = {}
+
+        # Per-endpoint latency histograms and error/timeout counters
+        self.metrics = metrics
+        self._latency = {name: metrics.histogram(f"fetch.{name}.latency") for name in self.ENDPOINTS}
+        self._errors = {name: metrics.counter(f"fetch.{name}.errors") for name in self.ENDPOINTS}
+        self._timeouts = {name: metrics.counter(f"fetch.{name}.timeouts") for name in self.ENDPOINTS}
+
+        self._endpoint_handlers = {
+            self.GAME_DATA: (self._request_game_data, self._apply_game_data),
+            self.DECK: (self._request_deck_data, self._apply_deck_data),
+            self.GAME_RESULT: (self._request_game_result, self._apply_game_result),
+        }
+
+    def _get_json(self, endpoint, link, label):
+        """GET an endpoint on the shared session.
+
+        Returns the decoded JSON, UNCHANGED when the raw bytes match the previous
+        response (so nothing is parsed), or None on failure.
+        """
+        started = time.perf_counter()
         try:
-            response = requests.get(self.game_data_link, timeout=1)
-            if response.status_code == 200:
-                self.game_data = response.json()
-            else:
-                print(f"[ERROR] Failed to fetch game data: {response.status_code}")
+            response = self.session.get(link, timeout=self.timeout)
+            return self._decode(endpoint, label, response.status_code, response.content)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self._note_unreachable(endpoint, label, e)
         except requests.RequestException as e:
-            print(f"[ERROR] Error fetching game data: {e}")
+            self._errors[endpoint].inc()
+            self.log.error("Error fetching %s: %s", label, e, extra=RATE_LIMITED)
+        finally:
+            self._latency[endpoint].observe(time.perf_counter() - started)
+        return None
+
+    def _decode(self, endpoint, label, status, content):
+        """Turn a raw response into JSON, UNCHANGED or None, whatever transport fetched it."""
+        if status != 200:
+            self._errors[endpoint].inc()
+            self.log.error("Failed to fetch %s: %s", label, status, extra=RATE_LIMITED)
+            return None
+        fingerprint = hashlib.blake2b(content, digest_size=16).digest()
+        if fingerprint == self._fingerprints.get(endpoint):
+            return UNCHANGED
+        try:
+            data = self._parse(endpoint, content)
+        except ValueError as e:
+            self._errors[endpoint].inc()
+            self.log.error("Error fetching %s: %s", label, e, extra=RATE_LIMITED)
+            return None
+        self._fingerprints[endpoint] = fingerprint
+        if self.recorder:
+            self._tick_payloads[endpoint] = content.decode("utf-8", errors="replace")
+        return data
+
+    def _note_unreachable(self, endpoint, label, error):
+        """Count a request that never got an answer; only logged while the client is thought online."""
+        self._unreachable[endpoint] = True
+        if isinstance(error, (requests.Timeout, TimeoutError)):
+            self._timeouts[endpoint].inc()
+        else:
+            self._errors[endpoint].inc()
+        if self.health.online:
+            self.log.error("Could not reach the client for %s: %s", label, str(error) or "timed out",
+                           extra=RATE_LIMITED)
+
+    def _gate(self, endpoints, now):
+        """Endpoints to actually request this tick, given the client's health."""
+        self._unreachable = {}
+        if self.health.online:
+            return endpoints
+        if self.health.probe_due(now):
+            return (self.PROBE_ENDPOINT,)
+        return ()
+
+    def _settle(self, fetched, now):
+        """Update client health from which of this tick's requests got through."""
+        if not fetched:
+            return
+        if all(self._unreachable.get(name) for name in fetched):
+            if self.health.record_failure(now):
+                self.log.warning("Client at %s is offline. Probing with backoff up to %.0fs.",
+                                 self.base_url, self.health.max_backoff)
+                # Report the offline state instead of the last board, and forget fingerprints
+                # so everything counts as new once the client is back
+                self.game_data = {}
+                self.changed[self.GAME_DATA] = True
+                self._fingerprints.clear()
+        elif self.health.record_success(now):
+            self.log.info("Client at %s is back online. Resuming full polling.", self.base_url)
+
+    def _state_flipped(self, data):
+        """True if a freshly fetched game data payload shows a different GameState than the last one.
+
+        The tick where GameState flips is when the tracker decides win or loss and
+        looks for the champion, so whatever endpoints the caller skipped this tick
+        are fetched then too rather than read stale.
+        """
+        return isinstance(data, dict) and data.get("GameState") != self.game_data.get("GameState")
+
+    def subscribe_fields(self, endpoint, consumer, fields=None):
+        """Declare which top-level fields `consumer` reads from `endpoint` (None for everything)."""
+        self.field_subscriptions[endpoint][consumer] = None if fields is None else frozenset(fields)
+
+    def unsubscribe_fields(self, endpoint, consumer):
+        self.field_subscriptions[endpoint].pop(consumer, None)
+
+    def wanted_fields(self, endpoint):
+        """Union of the subscribed fields, or None if the whole payload is needed."""
+        subscriptions = self.field_subscriptions[endpoint].values()
+        if not subscriptions or None in subscriptions:
+            return None
+        return frozenset().union(*subscriptions)
+
+    def _parse(self, endpoint, content):
+        fields = self.wanted_fields(endpoint)
+        if fields is None:
+            return json.loads(content)
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        return decode_fields(content, fields)
+
+    def _observe(self, endpoint, request):
+        """Run an endpoint request, noting when it was sent and answered if it succeeded."""
+        sent = self.time_source()
+        data = request()
+        if data is not None:
+            self.observed_at[endpoint] = (sent, self.time_source())
+        return data
+
+    def _request_game_data(self):
+        return self._get_json(self.GAME_DATA, self.game_data_link, "game data")
+
+    def _request_deck_data(self):
+        return self._get_json(self.DECK, self.deck_link, "deck data")
+
+    def _request_game_result(self):
+        return self._get_json(self.GAME_RESULT, self.game_result_link, "game result")
+
+    def _apply_game_data(self, data):
+        if data is None or data is UNCHANGED:
+            return
+        self.game_data = data
+        self.changed[self.GAME_DATA] = True
+
+    def _apply_deck_data(self, data):
+        if data is None or data is UNCHANGED:
+            return
+        self.cards_data = data
+        self.changed[self.DECK] = True
+
+        # Check if deck is available
+        if self.cards_data.get("CardsInDeck") is not None:
+            if not self.deck_loaded:
+                self.deck_loaded = True
+                self.log.info("Deck detected! Cards have been loaded.")
+        else:
+            self.deck_loaded = False  # Deck is not yet loaded
+
+    def _apply_game_result(self, data):
+        if data is None or data is UNCHANGED:
+            return
+        self.game_result = data
+        self.changed[self.GAME_RESULT] = True
+        # print(f"[INFO] Game result updated: {self.game_result}")
+
+    def fetch_game_data(self):
+        """Fetch live positional-rectangles game data."""
+        self._apply_game_data(self._request_game_data())
 
     def fetch_deck_data(self):
         """Fetch the static decklist during an active game."""
-        try:
-            response = requests.get(self.deck_link, timeout=1)
-            if response.status_code == 200:
-                self.cards_data = response.json()
-
-                # Check if deck is available
-                if self.cards_data.get("CardsInDeck") is not None:
-                    if not self.deck_loaded:
-                        self.deck_loaded = True
-                        print("[INFO] Deck detected! Cards have been loaded.")
-                else:
-                    self.deck_loaded = False  # Deck is not yet loaded
-
-            else:
-                print(f"[ERROR] Failed to fetch deck data: {response.status_code}")
-        except requests.RequestException as e:
-            print(f"[ERROR] Error fetching deck data: {e}")
+        self._apply_deck_data(self._request_deck_data())
 
     def fetch_game_result(self):
         """Fetch the result of the most recently completed game."""
-        try:
-            response = requests.get(self.game_result_link, timeout=1)
-            if response.status_code == 200:
-                self.game_result = response.json()
-                # print(f"[INFO] Game result updated: {self.game_result}")
-            else:
-                print(f"[ERROR] Failed to fetch game result: {response.status_code}")
-        except requests.RequestException as e:
-            print(f"[ERROR] Error fetching game result: {e}")
+        self._apply_game_result(self._request_game_result())
 
-    def update_all_data(self):
-        """Update all API data."""
-        self.fetch_game_data()
-        self.fetch_deck_data()
-        self.fetch_game_result()
+    def update_all_data(self, endpoints=None):
+        """Update API data for the given endpoint names (all of them when None).
+
+        In concurrent mode the endpoints are requested at the same time and
+        their results are only published once every request has finished, so a
+        tick always sees one consistent snapshot and costs roughly as long as the
+        slowest endpoint. While the client is offline (see ClientHealth) only the
+        occasional probe is sent.
+        """
+        if endpoints is None:
+            endpoints = self.ENDPOINTS
+        tick_started = self.time_source()
+        endpoints = self._gate(endpoints, tick_started)
+        for name in self.ENDPOINTS:
+            self.changed[name] = False
+        self.observed_at = {}
+
+        results = self._request_endpoints(endpoints)
+        if self._state_flipped(results.get(self.GAME_DATA)):
+            results.update(self._request_endpoints([name for name in self.ENDPOINTS if name not in results]))
+        for name in self.ENDPOINTS:
+            if name in results:
+                self._endpoint_handlers[name][1](results[name])
+        self._settle([name for name in self.ENDPOINTS if name in results], tick_started)
+
+        if self.recorder:
+            # Unreachable endpoints are recorded as null so replay sees the outage too
+            self._tick_payloads.update((name, None) for name in self._unreachable)
+            self.recorder.record_tick(tick_started, self._tick_payloads)
+            self._tick_payloads = {}
 
         if self.refresh_display_callback:
             self.refresh_display_callback()
 
+    def _request_endpoints(self, endpoints):
+        """Request the given endpoints (together in concurrent mode) and return {name: result}."""
+        pending = [(name, self._endpoint_handlers[name][0]) for name in self.ENDPOINTS if name in endpoints]
+        if self.concurrent:
+            futures = [(name, self.executor.submit(self._observe, name, request)) for name, request in pending]
+            return {name: future.result() for name, future in futures}
+        return {name: self._observe(name, request) for name, request in pending}
+
+    def fingerprint(self, endpoint):
+        """Return the fingerprint of the last payload published for an endpoint."""
+        return self._fingerprints.get(endpoint)
+
+    def close(self):
+        """Release the worker pool and the pooled connections."""
+        if self.executor:
+            self.executor.shutdown(wait=False)
+        self.session.close()
+
     # Game State Methods
     def get_game_state(self):
-        """Return the current game state."""
+        """Return the current game state, or CLIENT_OFFLINE while the client can't be reached."""
+        if not self.health.online:
+            return CLIENT_OFFLINE
         return self.game_data.get("GameState", "Unknown")
 
     def get_opponent_name(self):
@@ -102,3 +376,4 @@ if __name__ == "__main__":
     print("Opponent Name:", api.get_opponent_name())
     print("Deck:", api.get_deck())
     print("Game Result:", api.get_game_result())
+    api.close()
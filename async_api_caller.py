@@ -0,0 +1,155 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from api_caller import APICaller
+from log_service import RATE_LIMITED
+from metrics import REGISTRY
+
+
+class AsyncHTTPConnection:
+    """Minimal keep-alive HTTP/1.1 GET client on asyncio streams.
+
+    The LoR client API is plain local HTTP returning small JSON bodies, so this
+    only handles what it sends: Content-Length, chunked, or read-to-close
+    bodies. The connection is reopened after any error.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        if self.writer is None or self.writer.is_closing():
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def get(self, path):
+        """Return (status, body bytes) for GET `path`."""
+        await self._connect()
+        try:
+            self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                              f"Accept: application/json\r\n\r\n".encode("ascii"))
+            await self.writer.drain()
+            return await self._read_response()
+        except BaseException:
+            self.close()
+            raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by client API")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+            body = bytes(body)
+        else:
+            body = await self.reader.read()
+            self.close()
+
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class AsyncAPICaller(APICaller):
+    """APICaller whose requests run on an asyncio event loop instead of threads.
+
+    The daemon awaits `prefetch()` for the endpoints due this tick; the normal
+    synchronous `update_all_data()` then publishes those results, so LoRTimers
+    runs unchanged. Each endpoint gets its own keep-alive connection so a tick's
+    requests still go out together.
+    """
+
+    PATHS = {
+        APICaller.GAME_DATA: "/positional-rectangles",
+        APICaller.DECK: "/static-decklist",
+        APICaller.GAME_RESULT: "/game-result",
+    }
+
+    def __init__(self, base_url="http://127.0.0.1:21337", timeout=1, metrics=REGISTRY, time_source=time.time,
+                 log_name="api"):
+        super().__init__(None, None, concurrent=False, timeout=timeout, base_url=base_url,
+                         metrics=metrics, time_source=time_source, log_name=log_name)
+        url = urlsplit(self.base_url)
+        self.connections = {name: AsyncHTTPConnection(url.hostname, url.port or 80) for name in self.ENDPOINTS}
+        self._prefetched = {}
+        self._gated = ()
+        self._windows = {}
+
+    async def _fetch(self, endpoint, label):
+        started = time.perf_counter()
+        sent = self.time_source()
+        try:
+            status, body = await asyncio.wait_for(self.connections[endpoint].get(self.PATHS[endpoint]),
+                                                  self.timeout)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError) as e:
+            self._note_unreachable(endpoint, label, e)
+            return None
+        except (ValueError, IndexError) as e:
+            self._errors[endpoint].inc()
+            self.log.error("Error fetching %s from %s: %s", label, self.base_url, e, extra=RATE_LIMITED)
+            return None
+        finally:
+            self._latency[endpoint].observe(time.perf_counter() - started)
+        data = self._decode(endpoint, label, status, body)
+        if data is not None:
+            self._windows[endpoint] = (sent, self.time_source())
+        return data
+
+    async def prefetch(self, endpoints=None):
+        """Fetch the given endpoints (all of them when None) concurrently."""
+        labels = {self.GAME_DATA: "game data", self.DECK: "deck data", self.GAME_RESULT: "game result"}
+        names = super()._gate(self.ENDPOINTS if endpoints is None else endpoints, self.time_source())
+        self._gated = names
+        self._windows = {}
+        results = await asyncio.gather(*(self._fetch(name, labels[name]) for name in names))
+        self._prefetched = dict(zip(names, results))
+        if self._state_flipped(self._prefetched.get(self.GAME_DATA)):
+            # Same rule as the threaded caller: read the rest on the tick GameState flips
+            rest = [name for name in self.ENDPOINTS if name not in self._prefetched]
+            results = await asyncio.gather(*(self._fetch(name, labels[name]) for name in rest))
+            self._prefetched.update(zip(rest, results))
+            self._gated = tuple(name for name in self.ENDPOINTS if name in self._prefetched)
+
+    def _gate(self, endpoints, now):
+        return self._gated  # decided (and fetched) by prefetch()
+
+    def _get_json(self, endpoint, link, label):
+        return self._prefetched.pop(endpoint, None)
+
+    def _observe(self, endpoint, request):
+        data = request()
+        if data is not None:
+            self.observed_at[endpoint] = self._windows[endpoint]
+        return data
+
+    def close(self):
+        for connection in self.connections.values():
+            connection.close()
+        super().close()
@@ -0,0 +1,285 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+
+try:
+    import resource
+except ImportError:  # Unix only; Windows goes through psutil or tracemalloc below
+    resource = None
+
+from champion_stats import ChampionStatsTable
+from deck_resolver import load_json
+from event_bus import EventBus
+from LoR_Timers import LoRTimers
+from session_replay import ReplayAPICaller, replay_session
+
+# Stages timed inside the state machine, as (attribute on LoRTimers, report name)
+TRACKER_STAGES = [
+    ("update_game_state", "update_game_state"),
+    ("track_state_changes", "track_state_changes"),
+    ("determine_champion_from_deck", "determine_champion_from_deck"),
+]
+
+NO_PAYLOADS = {}
+
+
+def synthetic_session(ticks, data_folder="Data", tick_interval=0.5, menu_ticks=20, game_ticks=120,
+                      screen_ticks=6, games_per_champion=8, seed=0):
+    """Yield replay ticks for a made-up Path of Champions session.
+
+    Cycles through menus, games, victory/defeat screens (deck gone) and,
+    every few games, leaving the adventure for a different champion. Like a
+    recording, a tick only carries the payloads that changed.
+    """
+    rng = random.Random(seed)
+    starter_decks = load_json(os.path.join(data_folder, "static_deck_list.json"), {})
+    champions = sorted(starter_decks) or ["Unknown"]
+
+    def deck_payload(champion):
+        deck = starter_decks.get(champion, {}).get("CardsInDeck") if champion else None
+        return json.dumps({"DeckCode": None, "CardsInDeck": deck})
+
+    def state_payload(state):
+        return json.dumps({"GameState": state, "Rectangles": []})
+
+    def phases():
+        game_id = -1
+        won = False
+        while True:
+            champion = rng.choice(champions)
+            for _ in range(games_per_champion):
+                yield menu_ticks, "Menus", champion, game_id, won
+                yield game_ticks, "InProgress", champion, game_id, won
+                game_id += 1
+                won = rng.random() > 0.3
+                yield screen_ticks, "Menus", None, game_id, won
+            # Left the adventure; the watchdog needs a few ticks without a deck
+            yield 10, "Menus", None, game_id, won
+
+    previous = {}
+    timestamp = 1_700_000_000.0  # timers treat a zero start time as "not running"
+    emitted = 0
+    for length, state, champion, game_id, won in phases():
+        current = {
+            ReplayAPICaller.GAME_DATA: state_payload(state),
+            ReplayAPICaller.DECK: deck_payload(champion),
+            ReplayAPICaller.GAME_RESULT: json.dumps({"GameID": game_id, "LocalPlayerWon": won}),
+        }
+        for _ in range(length):
+            if emitted >= ticks:
+                return
+            changed = {endpoint: payload for endpoint, payload in current.items() if previous.get(endpoint) != payload}
+            previous = current
+            yield timestamp, changed or NO_PAYLOADS
+            timestamp += tick_interval
+            emitted += 1
+
+
+def synthetic_history(runs, data_folder="Data", seed=0):
+    """Build a game_durations dict holding `runs` completed runs."""
+    rng = random.Random(seed)
+    champions = sorted(load_json(os.path.join(data_folder, "static_deck_list.json"), {})) or ["Unknown"]
+    history = {}
+    for game_id in range(runs):
+        history.setdefault(rng.choice(champions), []).append(
+            {"timestamp": None, "duration": rng.uniform(60, 1800), "game_id": game_id})
+    return history
+
+
+def new_tracker(data_folder, history):
+    api = ReplayAPICaller()
+    game = LoRTimers(api, threading.Event(), data_folder, time_source=api.time_source)
+    game.game_durations.update(history)
+    game.champion_stats = ChampionStatsTable.from_durations(game.game_durations)
+    return game
+
+
+def time_calls(obj, attribute, samples):
+    """Replace obj.attribute with a wrapper appending each call's duration (ns) to samples."""
+    method = getattr(obj, attribute)
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter_ns() - start)
+
+    setattr(obj, attribute, timed)
+
+
+def measure_allocations(obj, attribute, samples):
+    """Replace obj.attribute with a wrapper recording each call's peak traced allocation (bytes)."""
+    method = getattr(obj, attribute)
+
+    def traced(*args, **kwargs):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            return method(*args, **kwargs)
+        finally:
+            samples.append(tracemalloc.get_traced_memory()[1] - before)
+
+    setattr(obj, attribute, traced)
+
+
+def summarize(samples, scale=1.0):
+    """Percentile summary of a sample array, values divided by `scale`."""
+    if not samples:
+        return {"calls": 0}
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def pct(q):
+        return ordered[min(count - 1, int(q * count))] / scale
+
+    return {"calls": count, "mean": sum(ordered) / count / scale,
+            "p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99), "max": ordered[-1] / scale}
+
+
+def bench_tracker(ticks, history_runs, memory_ticks, data_folder):
+    results = {}
+
+    # Latency pass: every stage wrapped at once, no tracing overhead
+    latencies = {name: array("q") for _, name in TRACKER_STAGES}
+    game = new_tracker(data_folder, synthetic_history(history_runs, data_folder))
+    for attribute, name in TRACKER_STAGES:
+        time_calls(game, attribute, latencies[name])
+
+    gc.collect()
+    started = time.perf_counter()
+    replay_session(synthetic_session(ticks, data_folder), game=game)
+    wall = time.perf_counter() - started
+    runs_recorded = sum(len(runs) for runs in game.game_durations.values()) - history_runs
+
+    # Peak memory pass: the same history, traced, and kept apart so tracing never skews the latencies
+    game = new_tracker(data_folder, synthetic_history(history_runs, data_folder))
+    gc.collect()
+    tracemalloc.start()
+    replay_session(synthetic_session(memory_ticks, data_folder), game=game)
+    peak_traced = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Allocation pass: one stage at a time so nested stages don't reset each other's peak
+    for attribute, name in TRACKER_STAGES:
+        allocations = array("q")
+        game = new_tracker(data_folder, {})
+        measure_allocations(game, attribute, allocations)
+        tracemalloc.start()
+        replay_session(synthetic_session(memory_ticks, data_folder), game=game)
+        tracemalloc.stop()
+        results[name] = {"latency_us": summarize(latencies[name], 1000),
+                         "alloc_peak_bytes": summarize(allocations)}
+
+    session = {"ticks": ticks, "wall_s": wall, "ticks_per_s": ticks / wall if wall else None,
+               "runs_recorded": runs_recorded,
+               "peak_traced_bytes": peak_traced, "peak_traced_ticks": memory_ticks}
+    return results, session
+
+
+def bench_refresh(history_runs, refreshes, data_folder):
+    """Time GameDurationsDisplay.refresh_data against a history of `history_runs` runs."""
+    try:
+        import tkinter as tk
+        from gui import GameDurationsDisplay
+        root = tk.Tk()
+    except Exception as e:  # No display (or no Tk) on this machine
+        return {"skipped": str(e)}
+
+    root.withdraw()
+    history = synthetic_history(history_runs, data_folder)
+    stats = ChampionStatsTable.from_durations(history)
+    gui = GameDurationsDisplay(
+        root=root, game_durations=history, event_bus=EventBus(),
+        stop_event=threading.Event(), clear_data=lambda: None, champion_data={},
+        reset_timers=lambda: None, champion_stats=stats)
+
+    latencies = array("q")
+    allocations = array("q")
+    time_calls(gui, "refresh_data", latencies)
+    rng = random.Random(1)
+    champions = list(history) or ["Elise"]
+    for i in range(refreshes):
+        # A run completes now and then, like a real session
+        if i % 50 == 0:
+            stats.record(rng.choice(champions), rng.uniform(60, 1800))
+        gui.refresh_data()
+
+    measure_allocations(gui, "refresh_data", allocations)
+    tracemalloc.start()
+    for _ in range(min(refreshes, 200)):
+        gui.refresh_data()
+    tracemalloc.stop()
+    root.destroy()
+    return {"latency_us": summarize(latencies, 1000), "alloc_peak_bytes": summarize(allocations)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def peak_memory_kb(peak_traced_bytes):
+    """Return (peak memory in KiB, where it came from) for this process.
+
+    getrusage where it exists, psutil's peak working set on Windows, and the
+    tracemalloc peak of the allocation pass when neither is available.
+    """
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return (max_rss // 1024 if sys.platform == "darwin" else max_rss), "ru_maxrss"  # bytes on macOS
+    try:
+        import psutil
+    except ImportError:
+        return peak_traced_bytes // 1024, "tracemalloc"
+    memory = psutil.Process().memory_info()
+    return getattr(memory, "peak_wset", memory.rss) // 1024, "psutil"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the timer state machine and display refresh.")
+    parser.add_argument("--ticks", type=int, default=100_000, help="Synthetic session length in ticks")
+    parser.add_argument("--history", type=int, default=5_000, help="Recorded runs preloaded before the session")
+    parser.add_argument("--memory-ticks", type=int, default=20_000, help="Ticks used for the allocation pass")
+    parser.add_argument("--refreshes", type=int, default=1_000, help="refresh_data calls to time")
+    parser.add_argument("--data-folder", default="Data")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    stages, session = bench_tracker(args.ticks, args.history, min(args.memory_ticks, args.ticks), args.data_folder)
+    stages["refresh_data"] = bench_refresh(args.history, args.refreshes, args.data_folder)
+    session["peak_memory_kb"], session["peak_memory_source"] = peak_memory_kb(session["peak_traced_bytes"])
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.time(),
+        "args": vars(args),
+        "session": session,
+        "stages": stages,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in stages.items():
+        latency = result.get("latency_us")
+        if latency and latency["calls"]:
+            print(f"{name:30} calls={latency['calls']:>9}  p50={latency['p50']:.1f}us  "
+                  f"p99={latency['p99']:.1f}us  max={latency['max']:.1f}us")
+        else:
+            print(f"{name:30} {result.get('skipped', 'no calls')}")
+    print(f"{session['ticks']} ticks in {session['wall_s']:.2f}s, peak traced {session['peak_traced_bytes']} bytes")
+    print(f"[INFO] Report written to {args.output}")
@@ -0,0 +1,129 @@
+HAND = "hand"
+BOARD = "board"
+
+DRAWN = "drawn"
+PLAYED = "played"
+REMOVED = "removed"
+
+# Hands are told apart from the board by height, as a fraction of the screen measured
+# from the bottom like TopLeftY: the local hand peeks up from below LOCAL_HAND_TOP, the
+# opponent's hangs down from above OPPONENT_HAND_BOTTOM
+LOCAL_HAND_TOP = 0.25
+OPPONENT_HAND_BOTTOM = 0.85
+
+# Both players draw at the start of every round, so a draw on each side within this many
+# seconds starts a new round, as long as the current one is at least MIN_ROUND_LENGTH old
+# (the mulligan also has both sides drawing)
+ROUND_DRAW_WINDOW = 1.5
+MIN_ROUND_LENGTH = 5.0
+
+
+def card_zone(local, top_y, height, screen_height):
+    if local:
+        return HAND if top_y < LOCAL_HAND_TOP * screen_height else BOARD
+    return HAND if top_y - height > OPPONENT_HAND_BOTTOM * screen_height else BOARD
+
+
+class BoardDiff:
+    """Diffs successive positional-rectangles snapshots keyed by CardID.
+
+    Each snapshot is reduced to {CardID: (code, local, y, height)} and compared
+    with the previous one as item sets, so the comparison runs in C and only
+    cards that appeared, vanished or moved get looked at in Python. The client
+    always sends the whole board, so finding what changed has to touch every
+    card once; that reduction costs less than decoding the payload did.
+    """
+
+    def __init__(self):
+        self.cards = {}
+        self.zones = {}
+
+    def reset(self):
+        self.cards = {}
+        self.zones = {}
+
+    def update(self, rectangles, screen_height):
+        """Apply a snapshot and return (kind, card_id, code, local) events for what changed."""
+        cards = {rect["CardID"]: (rect.get("CardCode"), rect.get("LocalPlayer", False),
+                                  rect.get("TopLeftY", 0), rect.get("Height", 0))
+                 for rect in rectangles if rect.get("CardCode") != "face"}
+        previous = self.cards
+        events = []
+
+        for card_id, (code, local, _, _) in previous.items() - cards.items():
+            if card_id in cards:
+                continue  # moved, handled below
+            zone = self.zones.pop(card_id)
+            events.append((PLAYED if zone == HAND else REMOVED, card_id, code, local))
+
+        for card_id, (code, local, top_y, height) in cards.items() - previous.items():
+            zone = card_zone(local, top_y, height, screen_height)
+            old_zone = self.zones.get(card_id)
+            self.zones[card_id] = zone
+            if old_zone is None:
+                events.append((DRAWN if zone == HAND else PLAYED, card_id, code, local))
+            elif old_zone == HAND and zone != HAND:
+                events.append((PLAYED, card_id, code, local))
+
+        self.cards = cards
+        return events
+
+
+class SplitTracker:
+    """Turns board changes during a game into per-round and per-action splits.
+
+    Rounds are inferred from both players drawing at about the same time; an
+    action is a card the local player played, timed from the previous action
+    (or the start of the round).
+    """
+
+    def __init__(self):
+        self.board = BoardDiff()
+        self.rounds = []
+        self.round_start = None
+        self.last_action = None
+        self.last_draw = {True: None, False: None}
+
+    def start(self, now):
+        """Begin tracking a new game at `now`."""
+        self.board.reset()
+        self.rounds = []
+        self.last_draw = {True: None, False: None}
+        self._start_round(now)
+
+    def _start_round(self, now):
+        self.round_start = now
+        self.last_action = now
+        self.rounds.append({"round": len(self.rounds) + 1, "start": now, "duration": None, "actions": []})
+
+    def update(self, game_data, now):
+        """Feed a positional-rectangles payload observed at `now`; returns the board events."""
+        if self.round_start is None:
+            return []
+        screen_height = (game_data.get("Screen") or {}).get("ScreenHeight") or 1
+        events = self.board.update(game_data.get("Rectangles") or (), screen_height)
+        for kind, _, code, local in events:
+            if kind == DRAWN:
+                self.last_draw[local] = now
+                other = self.last_draw[not local]
+                if other is not None and now - other <= ROUND_DRAW_WINDOW \
+                        and now - self.round_start >= MIN_ROUND_LENGTH:
+                    self.rounds[-1]["duration"] = now - self.round_start
+                    self._start_round(now)
+            elif kind == PLAYED and local:
+                self.rounds[-1]["actions"].append(
+                    {"card": code, "at": now - self.round_start, "split": now - self.last_action})
+                self.last_action = now
+        return events
+
+    def finish(self, now):
+        """Close the game at `now` and return its rounds (start times made relative to the game)."""
+        if self.round_start is None:
+            return []
+        self.rounds[-1]["duration"] = now - self.round_start
+        game_start = self.rounds[0]["start"]
+        for round_split in self.rounds:
+            round_split["start"] -= game_start
+        rounds, self.rounds = self.rounds, []
+        self.round_start = None
+        return rounds
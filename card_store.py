@@ -0,0 +1,250 @@
+import os
+import re
+from array import array
+
+from data_cache import load_compiled
+
+# Card codes look like 01SI053 (set, region, number) with an optional token suffix such as T1
+CARD_CODE = re.compile(r"^(\d{2})([A-Z]{2})(\d{3})(.*)$")
+
+
+def parse_card_code(code):
+    """Split a card code into (set number, region code, card number, suffix), or None if malformed."""
+    match = CARD_CODE.match(code)
+    if match is None:
+        return None
+    set_number, region, number, suffix = match.groups()
+    return int(set_number), region, int(number), suffix
+
+
+def _number(value):
+    """Some index entries store stats as strings (or empty strings); treat those like the ints."""
+    if isinstance(value, str):
+        return int(value) if value.strip().lstrip("-").isdigit() else 0
+    return int(value or 0)
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+class Interner:
+    """Maps repeated strings (regions, rarities, types...) to small integer ids."""
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def intern(self, value):
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def get(self, value):
+        return self.ids.get(value)
+
+
+class Card:
+    """Read-only view of one row in a CardStore."""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def code(self):
+        return self.store.codes[self.row]
+
+    @property
+    def name(self):
+        return self.store.names.values[self.store.name_ids[self.row]]
+
+    @property
+    def type(self):
+        return self.store.types.values[self.store.type_ids[self.row]]
+
+    @property
+    def rarity(self):
+        return self.store.rarities.values[self.store.rarity_ids[self.row]]
+
+    @property
+    def spell_speed(self):
+        return self.store.spell_speeds.values[self.store.spell_speed_ids[self.row]]
+
+    @property
+    def regions(self):
+        return self.store.region_names(self.store.region_masks[self.row])
+
+    @property
+    def cost(self):
+        return self.store.costs[self.row]
+
+    @property
+    def attack(self):
+        return self.store.attacks[self.row]
+
+    @property
+    def health(self):
+        return self.store.healths[self.row]
+
+    @property
+    def collectible(self):
+        return bool(self.store.collectibles[self.row])
+
+    @property
+    def set_number(self):
+        return self.store.set_numbers[self.row]
+
+    @property
+    def card_number(self):
+        return self.store.card_numbers[self.row]
+
+    def __repr__(self):
+        return f"Card({self.code!r}, {self.name!r})"
+
+
+class CardStore:
+    """Columnar store for distilled_card_index.json.
+
+    Each field is a typed array indexed by row, and every repeated string
+    (name, type, rarity, spell speed, region) is interned to a small integer,
+    so a card costs a few dozen bytes instead of a dict of strings. Regions
+    are a bitmask, which makes region filters a single AND per card. Card
+    codes are parsed into set, region and number so rows can also be found by
+    an integer key.
+    """
+
+    def __init__(self):
+        self.codes = []
+        self.rows = {}  # card code -> row
+        self.keys = {}  # packed (set, region, number) -> row, base cards only
+
+        self.names = Interner()
+        self.types = Interner()
+        self.rarities = Interner()
+        self.spell_speeds = Interner()
+        self.regions = Interner()
+        self.code_regions = Interner()  # two-letter region codes from card codes
+
+        self.name_ids = array("H")
+        self.type_ids = array("B")
+        self.rarity_ids = array("B")
+        self.spell_speed_ids = array("B")
+        self.region_masks = array("I")
+        self.costs = array("b")
+        self.attacks = array("h")
+        self.healths = array("h")
+        self.collectibles = array("B")
+        self.set_numbers = array("B")
+        self.code_region_ids = array("B")
+        self.card_numbers = array("H")
+
+    @classmethod
+    def load(cls, data_folder="Data"):
+        return cls.from_index(load_compiled(os.path.join(data_folder, "distilled_card_index.json")))
+
+    @classmethod
+    def from_index(cls, cards):
+        """Build a store from a card code -> card mapping; this decodes every card, so do it once."""
+        store = cls()
+        for code, card in cards.items():
+            store.add(code, card)
+        return store
+
+    def pack_key(self, set_number, region, number):
+        region_id = self.code_regions.get(region)
+        if region_id is None:
+            return None
+        return set_number << 24 | region_id << 16 | number
+
+    def add(self, code, card):
+        row = len(self.codes)
+        self.codes.append(code)
+        self.rows[code] = row
+
+        parsed = parse_card_code(code)
+        set_number, region, number, suffix = parsed if parsed else (0, "", 0, code)
+        self.set_numbers.append(set_number)
+        self.code_region_ids.append(self.code_regions.intern(region))
+        self.card_numbers.append(number)
+        if parsed and not suffix:
+            self.keys[self.pack_key(set_number, region, number)] = row
+
+        regions = card.get("regions") or ()
+        if isinstance(regions, str):
+            regions = [regions]  # a few newer entries store a single region as a plain string
+        mask = 0
+        for region_name in regions:
+            mask |= 1 << self.regions.intern(region_name)
+        self.region_masks.append(mask)
+
+        self.name_ids.append(self.names.intern(card.get("name", "")))
+        self.type_ids.append(self.types.intern(card.get("type", "")))
+        self.rarity_ids.append(self.rarities.intern(card.get("rarity", "")))
+        self.spell_speed_ids.append(self.spell_speeds.intern(card.get("spellSpeed", "")))
+        self.costs.append(_number(card.get("cost")))
+        self.attacks.append(_number(card.get("attack")))
+        self.healths.append(_number(card.get("health")))
+        self.collectibles.append(1 if _flag(card.get("collectible")) else 0)
+
+    def region_names(self, mask):
+        return [name for region_id, name in enumerate(self.regions.values) if mask >> region_id & 1]
+
+    def get(self, code):
+        row = self.rows.get(code)
+        return Card(self, row) if row is not None else None
+
+    def get_by_key(self, set_number, region, number):
+        row = self.keys.get(self.pack_key(set_number, region, number))
+        return Card(self, row) if row is not None else None
+
+    def __contains__(self, code):
+        return code in self.rows
+
+    def __len__(self):
+        return len(self.codes)
+
+    def filter(self, region=None, rarity=None, card_type=None, collectible=None, max_cost=None):
+        """Yield cards matching every given criterion."""
+        checks = []
+        if region is not None:
+            region_id = self.regions.get(region)
+            if region_id is None:
+                return
+            bit = 1 << region_id
+            masks = self.region_masks
+            checks.append(lambda row: masks[row] & bit)
+        for value, interner, ids in ((rarity, self.rarities, self.rarity_ids),
+                                     (card_type, self.types, self.type_ids)):
+            if value is not None:
+                wanted = interner.get(value)
+                if wanted is None:
+                    return
+                checks.append(lambda row, ids=ids, wanted=wanted: ids[row] == wanted)
+        if collectible is not None:
+            checks.append(lambda row: bool(self.collectibles[row]) == collectible)
+        if max_cost is not None:
+            checks.append(lambda row: self.costs[row] <= max_cost)
+
+        for row in range(len(self.codes)):
+            if all(check(row) for check in checks):
+                yield Card(self, row)
+
+    def region_counts(self, deck):
+        """Count cards per region name for a CardsInDeck dict."""
+        counts = [0] * len(self.regions.values)
+        for code, copies in deck.items():
+            row = self.rows.get(code)
+            if row is None:
+                continue
+            mask = self.region_masks[row]
+            for region_id in range(len(counts)):
+                if mask >> region_id & 1:
+                    counts[region_id] += copies
+        return {name: count for name, count in zip(self.regions.values, counts) if count}
@@ -0,0 +1,211 @@
+import json
+import math
+import os
+import threading
+
+
+def run_duration(run):
+    """Duration of a stored run; older data stores bare floats instead of dicts."""
+    return run["duration"] if isinstance(run, dict) else run
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a bounded relative error.
+
+    Values are counted in logarithmically sized buckets (the DDSketch scheme),
+    so any quantile is within `accuracy` of the true value, adding a value is
+    O(1), and the size depends on the range of durations rather than on how
+    many runs were recorded. Two sketches merge by adding bucket counts.
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Can only merge sketches with the same accuracy.")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        """Return the approximate q-quantile (0 <= q <= 1), or None if empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {"accuracy": self.accuracy, "zero_count": self.zero_count,
+                "buckets": {str(index): count for index, count in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
+
+
+class ChampionStats:
+    """Running aggregates for one champion's completed runs.
+
+    Median, p90 and standard deviation are refreshed when a run is added, so
+    reading them is constant time no matter how long the history is.
+    """
+
+    __slots__ = ("count", "total", "fastest", "last", "mean", "m2", "sketch", "median", "p90")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.fastest = None
+        self.last = None
+        self.mean = 0.0
+        self.m2 = 0.0  # Welford's sum of squared deviations
+        self.sketch = QuantileSketch()
+        self.median = None
+        self.p90 = None
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if self.fastest is None or duration < self.fastest:
+            self.fastest = duration
+        self.last = duration
+
+        delta = duration - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (duration - self.mean)
+
+        self.sketch.add(duration)
+        self._refresh_quantiles()
+
+    def _refresh_quantiles(self):
+        self.median = self.sketch.quantile(0.5)
+        self.p90 = self.sketch.quantile(0.9)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "total": self.total, "fastest": self.fastest, "last": self.last,
+                "mean": self.mean, "m2": self.m2, "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for field in ("count", "total", "fastest", "last", "mean", "m2"):
+            setattr(stats, field, data[field])
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        stats._refresh_quantiles()
+        return stats
+
+
+class ChampionStatsTable:
+    """Per-champion aggregates kept up to date as runs are recorded.
+
+    The game thread calls record() for every completed run; the GUI calls
+    pop_dirty() to find out which champions actually changed since its last
+    refresh, so a refresh never has to walk the whole run history.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.last_duration = 0
+        self._dirty = set()
+        self._cleared = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_durations(cls, game_durations):
+        table = cls()
+        for champion, runs in game_durations.items():
+            for run in runs:
+                table.record(champion, run_duration(run))
+        return table
+
+    @classmethod
+    def load(cls, stats_path, game_durations):
+        """Restore persisted stats and fold in any runs recorded after they were saved.
+
+        Runs are only ever appended, so a champion whose saved count is ahead of
+        its run list means the files disagree and it is rebuilt from scratch.
+        """
+        if not stats_path or not os.path.exists(stats_path):
+            return cls.from_durations(game_durations)
+
+        with open(stats_path, "r", encoding="utf-8") as f:
+            try:
+                saved = json.load(f)
+            except json.JSONDecodeError:
+                print(f"[ERROR] Could not decode stats '{stats_path}'. Rebuilding from runs.")
+                return cls.from_durations(game_durations)
+
+        table = cls()
+        for champion, runs in game_durations.items():
+            data = saved.get(champion)
+            if data is not None and data["count"] <= len(runs):
+                table.stats[champion] = ChampionStats.from_dict(data)
+                table._dirty.add(champion)
+                runs = runs[data["count"]:]
+            for run in runs:
+                table.record(champion, run_duration(run))
+        # Restored champions never go through record(), so take the last run from the history
+        last_runs = [runs[-1] for runs in game_durations.values() if runs]
+        if last_runs:
+            table.last_duration = run_duration(last_runs[-1])
+        return table
+
+    def to_dict(self):
+        with self._lock:
+            return {champion: stats.to_dict() for champion, stats in self.stats.items()}
+
+    def record(self, champion, duration):
+        with self._lock:
+            self.stats.setdefault(champion, ChampionStats()).add(duration)
+            self.last_duration = duration
+            self._dirty.add(champion)
+
+    def clear(self):
+        with self._lock:
+            self.stats.clear()
+            self.last_duration = 0
+            self._dirty.clear()
+            self._cleared = True
+
+    def pop_dirty(self):
+        """Return (cleared, {champion: ChampionStats}) for everything changed since the last call."""
+        with self._lock:
+            changed = {champion: self.stats[champion] for champion in self._dirty}
+            cleared = self._cleared
+            self._dirty.clear()
+            self._cleared = False
+        return cleared, changed
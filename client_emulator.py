@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from deck_resolver import load_json
+
+NO_GAME_RESULT = {"GameID": -1, "LocalPlayerWon": False}
+
+
+def step(duration, state, champion=None, game_result=None, rectangles=0):
+    """One scripted stretch of client behaviour lasting `duration` seconds.
+
+    A `state` of None means the client isn't running: connections are closed
+    without an answer.
+    """
+    return {"duration": duration, "state": state, "champion": champion,
+            "game_result": game_result, "rectangles": rectangles}
+
+
+def adventure_scenario(champion="Elise", games=3, game_length=20.0, screen_length=3.0):
+    """Menus, then a run of games with victory screens, a loss, and finally leaving the adventure."""
+    steps = [step(5.0, "Menus", champion)]
+    result = dict(NO_GAME_RESULT)
+    for game_id in range(games):
+        steps.append(step(game_length, "InProgress", champion, result, rectangles=12))
+        result = {"GameID": game_id, "LocalPlayerWon": game_id != 1}
+        # Deck vanishes while the victory/defeat screen is up
+        steps.append(step(screen_length, "Menus", None, result))
+        steps.append(step(5.0, "Menus", champion, result))
+    steps.append(step(10.0, "Menus", None, result))
+    return steps
+
+
+def large_board_scenario(champion="Elise", rectangles=2000, game_length=30.0):
+    """A single long game with a huge positional-rectangles payload."""
+    return [step(2.0, "Menus", champion),
+            step(game_length, "InProgress", champion, NO_GAME_RESULT, rectangles),
+            step(5.0, "Menus", None, {"GameID": 0, "LocalPlayerWon": True})]
+
+
+def step_at(steps, elapsed, loop=False):
+    """The step a scenario is in `elapsed` seconds after it started."""
+    total = sum(s["duration"] for s in steps)
+    if loop and total:
+        elapsed %= total
+    for s in steps:
+        if elapsed < s["duration"]:
+            return s
+        elapsed -= s["duration"]
+    return steps[-1]
+
+
+def scenario_payload(s, path, starter_decks):
+    """What the client answers on `path` during step `s`; None for an unknown path."""
+    if path == "/positional-rectangles":
+        rectangles = [
+            {"CardID": card_id, "CardCode": "face" if card_id == 0 else "01SI002",
+             "TopLeftX": 100 + card_id % 20 * 60, "TopLeftY": 200 + card_id // 20 * 80,
+             "Width": 60, "Height": 80, "LocalPlayer": card_id % 2 == 0}
+            for card_id in range(s["rectangles"])
+        ]
+        return {"PlayerName": "Emulator", "OpponentName": None if s["state"] == "Menus" else "Bot",
+                "GameState": s["state"], "Screen": {"ScreenWidth": 1920, "ScreenHeight": 1080},
+                "Rectangles": rectangles}
+    if path == "/static-decklist":
+        deck = starter_decks.get(s["champion"], {}).get("CardsInDeck") if s["champion"] else None
+        return {"DeckCode": None, "CardsInDeck": deck}
+    if path == "/game-result":
+        return s["game_result"] or NO_GAME_RESULT
+    return None
+
+
+SCENARIOS = {
+    "adventure": adventure_scenario,
+    "large_board": large_board_scenario,
+}
+
+
+class ClientEmulator:
+    """Serves /positional-rectangles, /static-decklist and /game-result from a scripted scenario.
+
+    Latency (plus uniform jitter), HTTP error responses and dropped
+    connections can be injected to see how the tracker copes with a slow or
+    flapping client. `speed` compresses the scenario's timeline.
+    """
+
+    def __init__(self, steps, host="127.0.0.1", port=21337, data_folder="Data",
+                 latency=0.0, jitter=0.0, failure_rate=0.0, drop_rate=0.0, speed=1.0, loop=False, seed=None):
+        self.steps = steps
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.speed = speed
+        self.loop = loop
+        self.random = random.Random(seed)
+        self.starter_decks = load_json(os.path.join(data_folder, "static_deck_list.json"), {})
+        self.total_duration = sum(s["duration"] for s in steps)
+
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.started = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self.server.serve_forever, name="client-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def current_step(self):
+        return step_at(self.steps, (time.monotonic() - self.started) * self.speed, self.loop)
+
+    def payload(self, path):
+        return scenario_payload(self.current_step(), path, self.starter_decks)
+
+    def _make_handler(self):
+        emulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                delay = emulator.latency + emulator.random.uniform(0, emulator.jitter)
+                if delay:
+                    time.sleep(delay)
+                if emulator.current_step()["state"] is None or emulator.random.random() < emulator.drop_rate:
+                    self.close_connection = True
+                    return
+                if emulator.random.random() < emulator.failure_rate:
+                    self.send_error(503)
+                    return
+
+                data = emulator.payload(self.path)
+                if data is None:
+                    self.send_error(404)
+                    return
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Emulate the LoR client API for load and latency testing.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="adventure")
+    parser.add_argument("--scenario-file", help="JSON list of steps (duration, state, champion, game_result, rectangles)")
+    parser.add_argument("--port", type=int, default=21337)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of connections closed without a reply")
+    parser.add_argument("--speed", type=float, default=1.0, help="Play the scenario this many times faster")
+    parser.add_argument("--loop", action="store_true", help="Restart the scenario when it ends")
+    args = parser.parse_args()
+
+    if args.scenario_file:
+        with open(args.scenario_file, "r", encoding="utf-8") as f:
+            steps = [step(**s) for s in json.load(f)]
+    else:
+        steps = SCENARIOS[args.scenario]()
+
+    emulator = ClientEmulator(steps, port=args.port, latency=args.latency, jitter=args.jitter,
+                              failure_rate=args.failure_rate, drop_rate=args.drop_rate,
+                              speed=args.speed, loop=args.loop).start()
+    print(f"[INFO] Emulating the LoR client at {emulator.base_url} ({args.scenario}).")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        emulator.stop()
@@ -0,0 +1,64 @@
+class ClientHealth:
+    """Circuit breaker for the LoR client API.
+
+    After `failure_threshold` ticks in a row where the client couldn't be
+    reached at all, the circuit opens: the client counts as offline and only
+    a single probe goes out, with the delay between probes doubling from
+    `initial_backoff` up to `max_backoff`. The first probe that gets an
+    answer closes the circuit again.
+    """
+
+    ONLINE = "online"
+    OFFLINE = "offline"
+
+    def __init__(self, failure_threshold=2, initial_backoff=0.5, max_backoff=5.0):
+        self.failure_threshold = failure_threshold
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self.state = self.ONLINE
+        self.failures = 0
+        self.backoff = initial_backoff
+        self.next_probe = 0.0
+        self.offline_since = None
+        # Bracket the edges of an outage: last answered tick, first and last unanswered ones
+        self.last_success = None
+        self.failing_since = None
+        self.last_failure = None
+
+    @property
+    def online(self):
+        return self.state == self.ONLINE
+
+    def probe_due(self, now):
+        return not self.online and now >= self.next_probe
+
+    def record_success(self, now):
+        """Note that the client answered; returns True if that brought it back online."""
+        self.failures = 0
+        self.last_success = now
+        self.failing_since = None
+        if self.online:
+            return False
+        self.state = self.ONLINE
+        self.backoff = self.initial_backoff
+        self.offline_since = None
+        return True
+
+    def record_failure(self, now):
+        """Note a tick where the client was unreachable; returns True if the circuit just opened."""
+        if self.failures == 0:
+            self.failing_since = now
+        self.failures += 1
+        self.last_failure = now
+        if not self.online:
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            self.next_probe = now + self.backoff
+            return False
+        if self.failures < self.failure_threshold:
+            return False
+        self.state = self.OFFLINE
+        self.offline_since = now
+        self.backoff = self.initial_backoff
+        self.next_probe = now + self.backoff
+        return True
@@ -0,0 +1,196 @@
+import csv
+import itertools
+import os
+import queue
+import threading
+
+# Accepted header names for each field, lower-cased with spaces and underscores removed
+HEADER_ALIASES = {
+    "champion": ("champion", "deck", "name"),
+    "duration": ("duration", "seconds", "time", "runtime"),
+    "game_id": ("gameid", "game", "id"),
+    "timestamp": ("timestamp", "date", "datetime", "when"),
+    "error": ("error", "errorbound"),
+}
+# Column order of headerless files written by older versions
+LEGACY_COLUMNS = ("champion", "duration", "game_id")
+EXPORT_COLUMNS = ("Champion", "Duration", "GameID", "Timestamp", "Error")
+
+
+def run_key(champion, record):
+    """Identity of a run for de-duplication.
+
+    Game IDs restart whenever the client restarts, so the ID is paired with
+    the timestamp (or the duration, for runs without one).
+    """
+    marker = record.get("timestamp") or round(record.get("duration", 0), 3)
+    return champion, record.get("game_id"), marker
+
+
+def parse_duration(value):
+    """Seconds from '123.4', 'm:ss' or 'h:mm:ss'."""
+    value = value.strip()
+    if ":" in value:
+        seconds = 0.0
+        for part in value.split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    return float(value)
+
+
+def _column_map(header):
+    normalized = [column.strip().lower().replace("_", "").replace(" ", "") for column in header]
+    columns = {}
+    for field, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+    return columns
+
+
+class CsvWorker:
+    """Imports and exports run history on a background thread.
+
+    Work is done in chunks; each finished chunk, progress update and the
+    final summary are posted to `messages` as (kind, payload) tuples for the
+    Tk thread to pick up with root.after, so the window never waits on disk.
+    Kinds are "chunk" (list of (champion, record)), "progress" (0..1),
+    "done" (summary string) and "error" (message).
+    """
+
+    def __init__(self, chunk_size=2000):
+        self.chunk_size = chunk_size
+        self.messages = queue.SimpleQueue()
+        self.thread = None
+
+    @property
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _start(self, target, *args):
+        if self.busy:
+            self.messages.put(("error", "Another import/export is still running."))
+            return False
+        self.thread = threading.Thread(target=self._run, args=(target, *args), name="csv-worker", daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self, target, *args):
+        try:
+            self.messages.put(("done", target(*args)))
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            self.messages.put(("error", str(e)))
+        except Exception as e:  # the GUI waits for "done" or "error", so one must always arrive
+            self.messages.put(("error", f"{type(e).__name__}: {e}"))
+
+    def start_import(self, path, existing_keys):
+        """Stream runs from `path`, skipping any whose run_key is in `existing_keys`."""
+        return self._start(self._import, path, set(existing_keys))
+
+    def start_export(self, path, game_durations):
+        """Write every run in `game_durations` to `path`."""
+        return self._start(self._export, path, game_durations)
+
+    def _import(self, path, seen):
+        total_size = os.path.getsize(path) or 1
+        read = 0
+        imported = skipped = duplicates = 0
+        chunk = []
+
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            def lines():
+                nonlocal read
+                for line in f:
+                    read += len(line)
+                    yield line
+
+            reader = csv.reader(lines())
+            first = next(reader, None)
+            if first is None:
+                return f"Imported 0 runs from {path}"
+            columns = _column_map(first)
+            if "champion" not in columns or "duration" not in columns:
+                # No recognizable header: treat the first row as data in the legacy layout
+                columns = {field: index for index, field in enumerate(LEGACY_COLUMNS)}
+                rows = [first]
+            else:
+                rows = []
+
+            for row in itertools.chain(rows, reader):
+                record = self._parse_row(row, columns)
+                if record is None:
+                    skipped += 1
+                    continue
+                champion, record = record
+                key = run_key(champion, record)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                chunk.append((champion, record))
+                imported += 1
+
+                if len(chunk) >= self.chunk_size:
+                    self.messages.put(("chunk", chunk))
+                    self.messages.put(("progress", read / total_size))
+                    chunk = []
+
+        if chunk:
+            self.messages.put(("chunk", chunk))
+        self.messages.put(("progress", 1.0))
+        return (f"Imported {imported} runs from {path} "
+                f"({duplicates} duplicates, {skipped} unreadable rows skipped)")
+
+    @staticmethod
+    def _parse_row(row, columns):
+        def field(name):
+            index = columns.get(name)
+            return row[index].strip() if index is not None and index < len(row) else ""
+
+        champion = field("champion")
+        try:
+            duration = parse_duration(field("duration"))
+        except ValueError:
+            return None
+        if not champion:
+            return None
+
+        record = {"duration": duration}
+        game_id = field("game_id")
+        if game_id:
+            try:
+                record["game_id"] = int(float(game_id))
+            except (ValueError, OverflowError):  # OverflowError: "inf"
+                record["game_id"] = game_id
+        else:
+            record["game_id"] = None
+        timestamp = field("timestamp")
+        if timestamp:
+            record["timestamp"] = timestamp
+        error = field("error")
+        if error:
+            try:
+                record["error"] = float(error)
+            except ValueError:
+                pass
+        return champion, record
+
+    def _export(self, path, game_durations):
+        total = sum(len(runs) for runs in game_durations.values()) or 1
+        written = 0
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for champion, runs in game_durations.items():
+                for start in range(0, len(runs), self.chunk_size):
+                    chunk = runs[start:start + self.chunk_size]
+                    writer.writerows(
+                        [champion, run["duration"], run.get("game_id"), run.get("timestamp"), run.get("error")]
+                        if isinstance(run, dict) else [champion, run, None, None, None]
+                        for run in chunk)
+                    written += len(chunk)
+                    self.messages.put(("progress", written / total))
+        os.replace(tmp_path, path)
+        return f"Saved {written} runs to {path}"
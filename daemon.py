@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import json
+import signal
+import threading
+
+from async_api_caller import AsyncAPICaller
+from board_diff import SplitTracker
+from LoR_Timers import LoRTimers
+from log_service import LogService, get_logger, parse_levels
+from metrics import REGISTRY, MetricsServer
+from overlay_server import OverlayServer
+from run_journal import RunJournal, user_data_path
+
+log = get_logger("daemon")
+
+
+def load_clients(path):
+    """Read a daemon config: {"data_folder": ..., "clients": [{"name", "base_url", "data_file", ...}, ...]}.
+
+    Optional per-client keys are "splits" (bool) and "overlay_port".
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return config.get("data_folder", "Data"), [client_config(**client) for client in config["clients"]]
+
+
+def client_config(name, base_url="http://127.0.0.1:21337", data_file=None, splits=False, overlay_port=None):
+    return {"name": name, "base_url": base_url, "data_file": data_file or user_data_path(f"{name}_durations.json"),
+            "splits": splits, "overlay_port": overlay_port}
+
+
+def parse_client(value):
+    """NAME=URL[,DATA_FILE] from the command line."""
+    name, _, rest = value.partition("=")
+    if not name or not rest:
+        raise argparse.ArgumentTypeError(f"expected NAME=URL[,DATA_FILE], got '{value}'")
+    base_url, _, data_file = rest.partition(",")
+    return client_config(name, base_url, data_file or None)
+
+
+class TrackerDaemon:
+    """Headless service running one tracker per LoR client on a single asyncio loop.
+
+    Every client keeps its own APICaller, journal and timers, but they share
+    the event loop (no polling or fetch threads per client), the deck resolver
+    and its card data, and one metrics registry with a prefix per client.
+    """
+
+    def __init__(self, clients, data_folder="Data", metrics=REGISTRY, log_service=None):
+        self.log_service = log_service
+        self.stop_event = threading.Event()
+        self.trackers = {}
+        self.overlays = []
+        deck_resolver = None
+        for client in clients:
+            if client["name"] in self.trackers:
+                raise ValueError(f"Duplicate client name '{client['name']}'")
+            client_metrics = metrics.scoped(client["name"])
+            api = AsyncAPICaller(client["base_url"], metrics=client_metrics, log_name=f"api.{client['name']}")
+            journal = RunJournal(client["data_file"])
+            game = LoRTimers(api, self.stop_event, data_folder, journal=journal, metrics=client_metrics,
+                             deck_resolver=deck_resolver,
+                             split_tracker=SplitTracker() if client["splits"] else None,
+                             log_name=f"tracker.{client['name']}")
+            deck_resolver = game.deck_resolver
+            self.trackers[client["name"]] = game
+            if client["overlay_port"]:
+                # Served from the daemon's own loop, so overlays cost no extra threads either
+                self.overlays.append(OverlayServer(game.event_bus, game.game_durations, port=client["overlay_port"]))
+        self._stopping = None
+
+    async def run_tracker(self, name, game):
+        while not self.stop_event.is_set():
+            try:
+                await game.api_caller.prefetch(game.begin_tick())
+                game.update_game_state()
+                wait = game.end_tick()
+            except Exception as e:
+                # One misbehaving client must not take the others down with it
+                log.exception("Tracker '%s' tick failed: %r", name, e)
+                wait = 1.0
+            try:
+                await asyncio.wait_for(self._stopping.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C still raises KeyboardInterrupt in the loop
+        if self.log_service and hasattr(signal, "SIGUSR1"):
+            loop.add_signal_handler(signal.SIGUSR1, self.dump_log)
+        for name, game in self.trackers.items():
+            log.info("Tracking '%s' at %s", name, game.api_caller.base_url)
+        try:
+            overlays = [asyncio.ensure_future(overlay.serve()) for overlay in self.overlays]
+            await asyncio.gather(*(self.run_tracker(name, game) for name, game in self.trackers.items()))
+            for overlay in overlays:
+                overlay.cancel()
+        finally:
+            self.close()
+
+    def stop(self):
+        log.info("Stopping daemon...")
+        self.stop_event.set()
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def dump_log(self, path="lor_daemon_recent.log"):
+        """Write the recent log ring buffer to disk (also on SIGUSR1)."""
+        log.info("Wrote %d recent log lines to %s", self.log_service.dump(path), path)
+
+    def close(self):
+        for game in self.trackers.values():
+            game.api_caller.close()
+            game.journal.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track Path of Champions run times for several clients, headless.")
+    parser.add_argument("--config", help="JSON file listing the clients to track")
+    parser.add_argument("--client", action="append", type=parse_client, default=[], metavar="NAME=URL[,DATA_FILE]",
+                        help="Track another client (repeatable); data defaults to NAME_durations.json in the user data folder")
+    parser.add_argument("--data-folder", default=None, help="Folder with champion and card data")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve read-only metrics as JSON on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--log-level", default="INFO", help="Default log level (DEBUG, INFO, WARNING, ERROR)")
+    parser.add_argument("--log-levels", type=parse_levels, default={}, metavar="COMPONENT=LEVEL,...",
+                        help="Per-component levels, e.g. api=WARNING,tracker.desk=DEBUG")
+    parser.add_argument("--log-file", help="Also write the log to this (rotated) file")
+    args = parser.parse_args()
+
+    data_folder, clients = load_clients(args.config) if args.config else ("Data", [])
+    clients += args.client
+    if not clients:
+        parser.error("no clients given; use --config or --client")
+
+    log_service = LogService(args.log_level.upper(), args.log_levels, path=args.log_file).start()
+    daemon = TrackerDaemon(clients, args.data_folder or data_folder, log_service=log_service)
+    if args.metrics_port:
+        MetricsServer(port=args.metrics_port).start()
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log_service.stop()
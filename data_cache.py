@@ -0,0 +1,170 @@
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+
+MAGIC = b"LORC"
+FORMAT_VERSION = 1
+# magic, format version, marshal version, python major/minor, source size, mtime (ns), source hash,
+# entry count, key width
+HEADER = struct.Struct("<4sHHBB2xQQ16sIH2x")
+# Each index entry is the padded key followed by the value's offset and length in the data blob
+ENTRY_TAIL = struct.Struct("<II")
+
+
+def _source_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).digest()
+
+
+class CompiledMap(Mapping):
+    """Read-only mapping over a memory-mapped compiled cache file.
+
+    Keys live in a sorted fixed-width index at the front of the file, so a
+    lookup is a binary search over the mapped bytes followed by decoding just
+    that one value. Nothing is parsed up front, which keeps startup flat no
+    matter how many cards the source JSON holds.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = HEADER.unpack_from(self._mm, 0)
+        self.count = fields[8]
+        self.key_width = fields[9]
+        self._entry_size = self.key_width + ENTRY_TAIL.size
+        self._index_start = HEADER.size
+        self._data_start = self._index_start + self.count * self._entry_size
+
+    def _key_at(self, position):
+        start = self._index_start + position * self._entry_size
+        return self._mm[start:start + self.key_width]
+
+    def _find(self, key):
+        encoded = key.encode("utf-8").ljust(self.key_width, b"\0")
+        if len(encoded) > self.key_width:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._key_at(low) == encoded:
+            return low
+        return None
+
+    def __getitem__(self, key):
+        position = self._find(key) if isinstance(key, str) else None
+        if position is None:
+            raise KeyError(key)
+        offset, length = ENTRY_TAIL.unpack_from(
+            self._mm, self._index_start + position * self._entry_size + self.key_width)
+        start = self._data_start + offset
+        return marshal.loads(self._mm[start:start + length])
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self._find(key) is not None
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self._key_at(position).rstrip(b"\0").decode("utf-8")
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def _read_header(cache_path):
+    try:
+        with open(cache_path, "rb") as f:
+            fields = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if fields[0] != MAGIC or fields[1] != FORMAT_VERSION or fields[2] != marshal.version \
+            or (fields[3], fields[4]) != sys.version_info[:2]:
+        return None
+    return fields
+
+
+def _update_mtime(cache_path, header, mtime_ns):
+    fields = list(header)
+    fields[6] = mtime_ns
+    with open(cache_path, "r+b") as f:
+        f.write(HEADER.pack(*fields))
+
+
+def compile_json(source_path, cache_path, source_hash=None):
+    """Compile a JSON object file into a cache file CompiledMap can map."""
+    with open(source_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"'{source_path}' is not a JSON object.")
+
+    stat = os.stat(source_path)
+    items = sorted((key.encode("utf-8"), marshal.dumps(value)) for key, value in data.items())
+    key_width = max((len(key) for key, _ in items), default=0)
+
+    index = bytearray()
+    blob = bytearray()
+    for key, value in items:
+        index += key.ljust(key_width, b"\0") + ENTRY_TAIL.pack(len(blob), len(value))
+        blob += value
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, *sys.version_info[:2],
+                         stat.st_size, stat.st_mtime_ns, source_hash or _source_hash(source_path),
+                         len(items), key_width)
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(index)
+        f.write(blob)
+    os.replace(tmp_path, cache_path)
+
+
+def load_compiled(source_path, cache_dir=None):
+    """Return a mapping for a JSON object file, served from a compiled cache.
+
+    The cache is reused when the source's size and mtime match; if only the
+    mtime moved, the content hash decides. Otherwise it is rebuilt. Falls back
+    to plain JSON if the cache can't be written.
+    """
+    cache_dir = cache_dir or os.path.join(os.path.dirname(source_path), ".cache")
+    cache_path = os.path.join(cache_dir, os.path.basename(source_path) + ".bin")
+
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        print(f"[ERROR] Data file '{source_path}' not found.")
+        return {}
+
+    header = _read_header(cache_path)
+    fresh = header is not None and header[5] == stat.st_size and header[6] == stat.st_mtime_ns
+    try:
+        if not fresh:
+            source_hash = _source_hash(source_path)
+            if header is not None and header[5] == stat.st_size and header[7] == source_hash:
+                # Touched but not changed: just record the new mtime so the next start takes the fast path
+                _update_mtime(cache_path, header, stat.st_mtime_ns)
+            else:
+                print(f"[INFO] Compiling '{source_path}' into '{cache_path}'.")
+                compile_json(source_path, cache_path, source_hash)
+        return CompiledMap(cache_path)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Could not use compiled cache for '{source_path}': {e}")
+        with open(source_path, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                print(f"[ERROR] Could not decode JSON in '{source_path}'.")
+                return {}
@@ -0,0 +1,118 @@
+import json
+import os
+from collections import OrderedDict, defaultdict
+
+from card_store import CardStore
+from data_cache import load_compiled
+
+# A champion card in the live deck outweighs any amount of starter-deck overlap
+CHAMPION_CARD_WEIGHT = 100
+# Without a champion card, this many starter cards must match before we guess
+MIN_STARTER_OVERLAP = 3
+
+
+def load_json(path, default):
+    """Load a JSON data file, returning `default` if it is missing or broken."""
+    if not os.path.exists(path):
+        print(f"[ERROR] Data file '{path}' not found.")
+        return default
+
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            print(f"[ERROR] Could not decode JSON in '{path}'.")
+            return default
+
+
+class DeckResolver:
+    """Works out which champion a live deck belongs to.
+
+    At startup the starter decks in static_deck_list.json are turned into an
+    inverted index of card code -> champions whose starter deck contains it.
+    A live CardsInDeck is scored against that index, with champion cards
+    (from champion_mapping.json and the card index) counting far more than
+    plain overlap, so multi-champion and heavily modified decks still resolve
+    to the right run. Results are memoized per deck fingerprint in a bounded
+    LRU, so repeat lookups are a single dict hit.
+    """
+
+    def __init__(self, champion_mapping, data_folder="Data", cache_size=64, card_store=None):
+        self.champion_mapping = dict(champion_mapping)
+        # Both files come from the compiled cache, so cards are only decoded when looked up
+        self.starter_decks = load_compiled(os.path.join(data_folder, "static_deck_list.json"))
+        self.card_index = load_compiled(os.path.join(data_folder, "distilled_card_index.json"))
+        self._card_store = card_store
+
+        self.card_to_champions = defaultdict(set)
+        for champion, deck in self.starter_decks.items():
+            for card_code in deck.get("CardsInDeck", {}):
+                self.card_to_champions[card_code].add(champion)
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    @property
+    def card_store(self):
+        """Columnar view of the whole card index, built on first use (that decodes every card)."""
+        if self._card_store is None:
+            self._card_store = CardStore.from_index(self.card_index)
+        return self._card_store
+
+    def champion_for_card(self, card_code):
+        """Champion a card belongs to, from the mapping or (failing that) the card index."""
+        champion = self.champion_mapping.get(card_code)
+        if champion is None:
+            card = self.card_index.get(card_code)
+            if card and card.get("rarity") == "Champion" and card.get("name") in self.starter_decks:
+                champion = card["name"]
+        return champion
+
+    @staticmethod
+    def fingerprint(deck):
+        return frozenset(deck.items())
+
+    def rank(self, deck):
+        """Return (champion, score) candidates for a deck, best first."""
+        scores = defaultdict(int)
+        first_seen = {}
+        for position, card_code in enumerate(deck):
+            champion = self.champion_for_card(card_code)
+            if champion is not None:
+                scores[champion] += CHAMPION_CARD_WEIGHT
+                first_seen.setdefault(champion, position)
+            for starter in self.card_to_champions.get(card_code, ()):
+                scores[starter] += 1
+                first_seen.setdefault(starter, position)
+
+        # Ties go to whichever champion showed up first in the decklist
+        return sorted(scores.items(), key=lambda item: (-item[1], first_seen[item[0]]))
+
+    def _resolve_uncached(self, deck):
+        ranked = self.rank(deck)
+        if not ranked:
+            return None
+        champion, score = ranked[0]
+        if score < CHAMPION_CARD_WEIGHT and score < MIN_STARTER_OVERLAP:
+            return None
+        return champion
+
+    def resolve(self, deck, fingerprint=None):
+        """Return the champion for `deck`, or None if it can't be determined.
+
+        Pass a precomputed fingerprint (e.g. a payload hash) to skip hashing the deck.
+        """
+        if not deck:
+            return None
+        if fingerprint is None:
+            fingerprint = self.fingerprint(deck)
+
+        if fingerprint in self._cache:
+            self._cache.move_to_end(fingerprint)
+            return self._cache[fingerprint]
+
+        champion = self._resolve_uncached(deck)
+        self._cache[fingerprint] = champion
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return champion
@@ -0,0 +1,72 @@
+from collections import defaultdict, deque, namedtuple
+
+# Events published by LoRTimers on the polling thread
+StateChanged = namedtuple("StateChanged", "previous current")
+ChampionDetected = namedtuple("ChampionDetected", "champion")
+# Snapshot of the timer fields; a running timer has a start time, a stopped one only a duration.
+# `segment` is how many games of the current run are already behind us (lost games carry over),
+# and `segment_start` the run time when the current one began (the time carried from them)
+TimersChanged = namedtuple("TimersChanged",
+                           "champion_start champion_duration menu_start menu_duration segment segment_start",
+                           defaults=(0, 0.0))
+RunCompleted = namedtuple("RunCompleted", "champion record")
+# Runs from elsewhere (a CSV import) that have been added to the history and journal: [(champion, record), ...]
+RunsImported = namedtuple("RunsImported", "runs")
+TimersReset = namedtuple("TimersReset", "")
+
+
+class Subscription:
+    """One consumer's queue of events.
+
+    deque.append and deque.popleft are atomic, so the publishing thread and
+    the consuming thread never take a lock.
+    """
+
+    def __init__(self, maxlen=None):
+        self._queue = deque(maxlen=maxlen)
+        self._handlers = defaultdict(list)
+
+    def on(self, event_type, handler):
+        """Call `handler(event)` for every event of `event_type` seen by dispatch()."""
+        self._handlers[event_type].append(handler)
+        return self
+
+    def push(self, event):
+        self._queue.append(event)
+
+    def drain(self):
+        """Pop and return every queued event, oldest first."""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.popleft())
+            except IndexError:
+                return events
+
+    def dispatch(self):
+        """Run the registered handlers for every queued event. Returns how many events were handled."""
+        events = self.drain()
+        for event in events:
+            for handler in self._handlers.get(type(event), ()):
+                handler(event)
+        return len(events)
+
+
+class EventBus:
+    """Fans events out from the polling thread to any number of subscriptions."""
+
+    def __init__(self):
+        self._subscriptions = ()
+
+    def subscribe(self, maxlen=None):
+        subscription = Subscription(maxlen)
+        # Swap in a new tuple so publish() can iterate without a lock
+        self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def publish(self, event):
+        for subscription in self._subscriptions:
+            subscription.push(event)
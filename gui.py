@@ -1,22 +1,59 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, font
+import datetime
 import time
-import csv
+import queue
 import threading
 
+from champion_stats import ChampionStatsTable
+from csv_io import CsvWorker, run_key
+from event_bus import ChampionDetected, RunCompleted, RunsImported, TimersChanged, TimersReset
+from metrics import REGISTRY
+from personal_best import PersonalBests
+
+try:
+    from run_history import RunHistory
+except ImportError:  # numpy is optional; without it the history view is just unavailable
+    RunHistory = None
+
 
 class GameDurationsDisplay:
-    def __init__(self, root, game_durations, get_current_deck, get_current_champion_time, get_menu_time, stop_event, clear_data, champion_data, reset_timers):
+    def __init__(self, root, game_durations, event_bus, stop_event, clear_data, champion_data, reset_timers, champion_stats=None, metrics=REGISTRY, show_stats=False, import_runs=None, remote_metrics=None):
         self.root = root  # Pass root from LoR_Timers.py
-        self.game_durations = game_durations  # Store game durations
-        self.get_current_deck = get_current_deck
-        self.get_current_champion_time = get_current_champion_time  # ✅ New
-        self.get_menu_time = get_menu_time  # ✅ New
+        # Our own copy of the history, kept up to date from RunCompleted events,
+        # so the game thread's dict is never iterated from the Tk thread
+        self.game_durations = {champion: list(runs) for champion, runs in game_durations.items()}
         self.stop_event = stop_event
         self.clear_data = clear_data
         self.champion_data = champion_data
         self.reset_timers = reset_timers  # ✅ Store reset_timers function
-
+        # Hands imported runs to whoever saves runs; they come back as a RunsImported event
+        self.import_runs = import_runs
+        # Running per-champion aggregates, so refreshes only touch changed rows. A table
+        # passed in is the tracker's, and the tracker records into it
+        self.owns_stats = champion_stats is None
+        if champion_stats is None:
+            champion_stats = ChampionStatsTable.from_durations(game_durations)
+        self.champion_stats = champion_stats
+        self.tree_rows = {}  # champion -> Treeview item id
+        # PB and sum-of-best split tables, so the live delta is a lookup per tick
+        self.personal_bests = PersonalBests.from_durations(self.game_durations)
+        # Columnar copy of the history for the history view's queries
+        self.history = RunHistory.from_durations(self.game_durations) if RunHistory else None
+        self.metrics = metrics
+        # Returns the fetch and loop metrics when the tracker runs in another process
+        self.remote_metrics = remote_metrics
+        self.refresh_duration = metrics.histogram("gui.refresh_duration")
+
+        # Latest state from the game thread; running timers are ticked locally
+        self.current_champion = None
+        self.timers = TimersChanged(None, 0, None, 0)
+        self.events = event_bus.subscribe()
+        self.events.on(ChampionDetected, self.on_champion_detected)
+        self.events.on(TimersChanged, self.on_timers_changed)
+        self.events.on(RunCompleted, self.on_run_completed)
+        self.events.on(TimersReset, self.on_timers_reset)
+        self.events.on(RunsImported, self.on_runs_imported)
 
         self.root.title("Game Durations Info")
 
@@ -46,6 +83,10 @@ class GameDurationsDisplay:
         self.menu_timer_label = ttk.Label(self.root, text="Menu Time: 00:00", style="TLabel")
         self.menu_timer_label.pack()
 
+        # Live ahead/behind against the current champion's personal best
+        self.pb_label = ttk.Label(self.root, text="", style="TLabel")
+        self.pb_label.pack()
+
         # Timer & Restart Button
         self.timer_frame = ttk.Frame(self.root, style="TFrame")
         self.timer_frame.pack()
@@ -56,90 +97,269 @@ class GameDurationsDisplay:
         self.restart_timer_button = ttk.Button(self.timer_frame, text="Restart Timer", command=self.restart_timer, style="TButton")
         self.restart_timer_button.pack(side=tk.LEFT, padx=10)
 
+        self.stats_button = ttk.Button(self.timer_frame, text="Show Stats", command=self.toggle_stats, style="TButton")
+        self.stats_button.pack(side=tk.LEFT, padx=10)
+
+        self.history_button = ttk.Button(self.timer_frame, text="Show History", command=self.toggle_history,
+                                         style="TButton", state=tk.NORMAL if self.history is not None else tk.DISABLED)
+        self.history_button.pack(side=tk.LEFT, padx=10)
+
+        # CSV import/export runs on a worker thread; progress shows up next to the buttons
+        self.csv_worker = CsvWorker()
+        self.transfer_action = ""
+        self.import_button = ttk.Button(self.timer_frame, text="Import CSV", command=self.upload_csv, style="TButton")
+        self.import_button.pack(side=tk.LEFT, padx=10)
+        self.export_button = ttk.Button(self.timer_frame, text="Export CSV", command=self.save_data, style="TButton")
+        self.export_button.pack(side=tk.LEFT, padx=10)
+        self.transfer_label = ttk.Label(self.root, text="", style="TLabel")
+        self.transfer_label.pack()
+
+        # Stats panel (hidden unless asked for)
+        self.stats_frame = ttk.Frame(self.root, style="TFrame")
+        self.stats_label = ttk.Label(self.stats_frame, text="", style="TLabel", justify=tk.LEFT)
+        self.stats_label.pack()
+        self.stats_visible = False
+
+        # History panel: weekly trend, rolling average and best runs for the selected champion
+        self.history_frame = ttk.Frame(self.root, style="TFrame")
+        self.history_label = ttk.Label(self.history_frame, text="", style="TLabel", justify=tk.LEFT)
+        self.history_label.pack()
+        self.history_tree = ttk.Treeview(self.history_frame, style="Treeview", height=8,
+                                         columns=("runs", "average", "best"))
+        self.history_tree.heading("#0", text="Week")
+        self.history_tree.heading("runs", text="Runs")
+        self.history_tree.heading("average", text="Average")
+        self.history_tree.heading("best", text="Best")
+        self.history_tree.pack(expand=True, fill="both")
+        self.history_visible = False
+
         # Last Game Duration Label
         self.last_game_duration_label = ttk.Label(self.root, text="Last Game Duration: 00:00", style="TLabel")
         self.last_game_duration_label.pack()
 
         # Treeview for Champion Times
         self.tree = ttk.Treeview(self.root, style="Treeview")
-        self.tree["columns"] = ("fastest_time", "average_time")
+        self.tree["columns"] = ("fastest_time", "average_time", "median_time", "p90_time", "stddev")
         self.tree.heading("#0", text="Champion")
         self.tree.heading("fastest_time", text="Fastest Time")
         self.tree.heading("average_time", text="Average Time")
+        self.tree.heading("median_time", text="Median")
+        self.tree.heading("p90_time", text="P90")
+        self.tree.heading("stddev", text="Std Dev")
         self.tree.pack(expand=True, fill="both")
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self.update_history_panel())
 
-        # Start the timer & refresh loop
+        # Start the timer & event loop
         self.start_time = time.time()
-        self.update_timer()
         self.refresh_data()
-        self.root.after(5000, self.refresh_data)
+        self.update_timer()
+        self.pump_events()
+
+        if show_stats:
+            self.toggle_stats()
 
         # Handle Escape Key & Window Close
         self.root.protocol("WM_DELETE_WINDOW", self.stop)
         self.root.bind("<Escape>", lambda event: self.stop())
 
     def update_timer(self):
-        """Updates the timer every second."""
+        """Updates the timer labels every second from the local clock."""
         if self.stop_event.is_set():
             return
         elapsed_time = int(time.time() - self.start_time)
         hours, remainder = divmod(elapsed_time, 3600)
         minutes, seconds = divmod(remainder, 60)
         self.timer_label.config(text=f"Timer: {hours:02}:{minutes:02}:{seconds:02}")
+        self.update_timer_labels()
+        if self.stats_visible:
+            self.update_stats_panel()
         self.root.after(1000, self.update_timer)
 
+    def update_timer_labels(self):
+        """Show the champion and menu timers as of now."""
+        now = time.time()
+        timers = self.timers
+        champion_time = now - timers.champion_start if timers.champion_start else timers.champion_duration
+        menu_time = timers.menu_duration + (now - timers.menu_start if timers.menu_start else 0)
+        self.champion_timer_label.config(text=f"Champion Time: {self.format_duration(champion_time)}")
+        self.menu_timer_label.config(text=f"Menu Time: {self.format_duration(menu_time)}")
+        self.update_pb_label(champion_time, timers.segment, timers.segment_start)
+
+    def update_pb_label(self, champion_time, segment, segment_start=0.0):
+        """Show the current champion's PB, sum of best and how far ahead of or behind the PB this run is."""
+        table = self.personal_bests.get(self.current_champion)
+        if table is None or table.pb is None:
+            self.pb_label.config(text="")
+            return
+        text = f"PB {self.format_duration(table.pb)}"
+        if table.sum_of_best is not None:
+            text += f" | Sum of Best {self.format_duration(table.sum_of_best)}"
+        if self.timers.champion_start or champion_time:
+            delta = table.delta(champion_time, segment, segment_start)
+            text += f" | {self.format_delta(delta)} {'behind' if delta > 0 else 'ahead'}"
+            self.pb_label.config(foreground="#e74c3c" if delta > 0 else "#2ecc71")
+        self.pb_label.config(text=text)
+
+    def pump_events(self):
+        """Drain events from the game thread and redraw only what they touched."""
+        if self.stop_event.is_set():
+            return
+        self.events.dispatch()
+        self.root.after(100, self.pump_events)
+
+    def on_champion_detected(self, event):
+        self.current_champion = event.champion
+        self.current_deck_label.config(text=f"Current Deck: {event.champion}")
+
+    def on_timers_changed(self, event):
+        self.timers = event
+        self.update_timer_labels()
+
+    def on_run_completed(self, event):
+        self.game_durations.setdefault(event.champion, []).append(event.record)
+        if self.owns_stats:
+            self.champion_stats.record(event.champion, event.record["duration"])
+        if self.personal_bests.record(event.champion, event.record):
+            print(f"[INFO] New personal best for {event.champion}: {self.format_duration(event.record['duration'])}")
+        if self.history is not None:
+            self.history.append(event.champion, event.record)
+        self.refresh_data()
+
+    def on_runs_imported(self, event):
+        self.add_runs(event.runs)
+        self.refresh_data()
+
+    def add_runs(self, runs):
+        for champion, record in runs:
+            self.game_durations.setdefault(champion, []).append(record)
+            if self.owns_stats:
+                self.champion_stats.record(champion, record["duration"])
+            self.personal_bests.record(champion, record)
+            if self.history is not None:
+                self.history.append(champion, record)
+
+    def on_timers_reset(self, event):
+        self.start_time = time.time()
+
     def restart_timer(self):
         """Restarts the game timer."""
         self.reset_timers()
-        self.start_time = time.time()
 
     def format_duration(self, duration):
         duration = int(duration)
         minutes, seconds = divmod(duration, 60)
         return f"{minutes}:{seconds:02}"
 
+    def format_delta(self, delta):
+        return ("-" if delta < 0 else "+") + self.format_duration(abs(delta))
+
     def clear_data_memory(self):
         """Clear the data in memory (without writing to disk)."""
         self.game_durations.clear()
+        self.champion_stats.clear()
+        self.personal_bests.clear()
+        if self.history is not None:
+            self.history.clear()
         print("cleared data")
         self.refresh_data()
 
     def refresh_data(self):
-        """Refresh UI elements including timers."""
+        """Redraw the champion rows that changed and the last game duration."""
         if self.stop_event.is_set():
             return
-
-        current_deck = self.get_current_deck()
-        self.current_deck_label.config(text=f"Current Deck: {current_deck}")
-
-        # ✅ Get the latest timers
-        champion_time = self.format_duration(self.get_current_champion_time())
-        menu_time = self.format_duration(self.get_menu_time())
-
-        # ✅ Update champion & menu timers
-        self.champion_timer_label.config(text=f"Champion Time: {champion_time}")
-        self.menu_timer_label.config(text=f"Menu Time: {menu_time}")
-
-        # ✅ Clear existing data in Treeview
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        last_game_duration = 0
-        for champion, games in self.game_durations.items():
-            if not games:
-                continue
-            durations = [game["duration"] if isinstance(game, dict) else game for game in
-                         games]  # ✅ Handle float values safely
-            fastest_time = min(durations)
-            average_time = sum(durations) / len(durations)
-            self.tree.insert("", "end", text=champion,
-                             values=(self.format_duration(fastest_time), self.format_duration(average_time)))
-            last_game_duration = durations[-1]
+        refresh_started = time.perf_counter()
+
+        # ✅ Only touch rows whose champion recorded a run since the last refresh
+        cleared, changed = self.champion_stats.pop_dirty()
+        if cleared:
+            for item in self.tree.get_children():
+                self.tree.delete(item)
+            self.tree_rows.clear()
+
+        for champion, stats in changed.items():
+            values = (self.format_duration(stats.fastest), self.format_duration(stats.average),
+                      self.format_duration(stats.median), self.format_duration(stats.p90),
+                      self.format_duration(stats.stddev))
+            item = self.tree_rows.get(champion)
+            if item is None:
+                self.tree_rows[champion] = self.tree.insert("", "end", text=champion, values=values)
+            else:
+                self.tree.item(item, values=values)
 
         # ✅ Update last game duration
-        self.last_game_duration_label.config(text=f"Last Game Duration: {self.format_duration(last_game_duration)}")
-
-        self.root.after(1000, self.refresh_data)
+        self.last_game_duration_label.config(
+            text=f"Last Game Duration: {self.format_duration(self.champion_stats.last_duration)}")
+        if self.history_visible:
+            self.update_history_panel()
+
+        self.refresh_duration.observe(time.perf_counter() - refresh_started)
+
+    def toggle_stats(self):
+        """Toggle the metrics panel."""
+        if self.stats_visible:
+            self.stats_frame.pack_forget()
+            self.stats_button.config(text="Show Stats")
+        else:
+            self.stats_frame.pack(before=self.tree)
+            self.stats_button.config(text="Hide Stats")
+            self.update_stats_panel()
+        self.stats_visible = not self.stats_visible
+
+    def update_stats_panel(self):
+        """Summarize endpoint latency, errors, loop timing and refresh cost."""
+        def ms(value):
+            return f"{value * 1000:.1f}ms" if value is not None else "-"
+
+        snapshot = self.metrics.snapshot()
+        if self.remote_metrics is not None:
+            snapshot = {**(self.remote_metrics() or {}), **snapshot}
+        lines = []
+        for name, metric in snapshot.items():
+            if name.startswith("fetch.") and name.endswith(".latency"):
+                endpoint = name[len("fetch."):-len(".latency")]
+                errors = snapshot.get(f"fetch.{endpoint}.errors", 0)
+                timeouts = snapshot.get(f"fetch.{endpoint}.timeouts", 0)
+                lines.append(f"{endpoint}: p50 {ms(metric['p50'])} p99 {ms(metric['p99'])} "
+                             f"errors {errors} timeouts {timeouts}")
+        for name, title in (("loop.tick_duration", "Tick"), ("loop.lag", "Lag"), ("gui.refresh_duration", "Refresh")):
+            metric = snapshot.get(name)
+            if metric:
+                lines.append(f"{title}: p50 {ms(metric['p50'])} p99 {ms(metric['p99'])} max {ms(metric['max'])}")
+        self.stats_label.config(text="\n".join(lines) or "No metrics yet")
+
+    def toggle_history(self):
+        """Toggle the run history panel."""
+        if self.history_visible:
+            self.history_frame.pack_forget()
+            self.history_button.config(text="Show History")
+        else:
+            self.history_frame.pack(before=self.tree, expand=True, fill="both")
+            self.history_button.config(text="Hide History")
+        self.history_visible = not self.history_visible
+        self.update_history_panel()
+
+    def update_history_panel(self):
+        """Show the weekly trend and recent form of the selected champion (or all runs)."""
+        if not self.history_visible or self.history is None:
+            return
+        selection = self.tree.selection()
+        champion = self.tree.item(selection[0], "text") if selection else None
+
+        weeks, counts, means, best = self.history.weekly_trend(champion)
+        self.history_tree.delete(*self.history_tree.get_children())
+        for week, count, mean, fastest in reversed(list(zip(weeks, counts, means, best))):
+            label = datetime.date.fromtimestamp(week).isoformat()
+            self.history_tree.insert("", "end", text=label,
+                                     values=(int(count), self.format_duration(mean), self.format_duration(fastest)))
+
+        rolling = self.history.rolling_average(champion, window=10)
+        best_five = self.history.best_of(5, champion)
+        lines = [f"{champion or 'All champions'}: {len(rolling)} runs"]
+        if len(rolling):
+            lines.append(f"Last 10 average: {self.format_duration(rolling[-1])}")
+            lines.append("Best 5: " + ", ".join(self.format_duration(value) for value in best_five))
+            lines.append(f"Runs with a loss: {self.history.loss_share(champion):.0%}")
+        self.history_label.config(text="\n".join(lines))
 
     def toggle_details(self):
         """Toggle details visibility."""
@@ -152,40 +372,55 @@ class GameDurationsDisplay:
         self.details_visible = not self.details_visible
 
     def upload_csv(self):
-        """Upload game data from a CSV file."""
+        """Import game data from a CSV file on a background thread."""
         file_path = filedialog.askopenfilename(defaultextension=".csv",
                                                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
         if file_path:
-            with open(file_path, 'r') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # Skip the header
-                for row in reader:
-                    champion, duration, game_id = row
-                    game_record = {
-                        'duration': float(duration),
-                        'game_id': int(game_id),
-                    }
-                    if champion not in self.game_durations:
-                        self.game_durations[champion] = []
-                    self.game_durations[champion].append(game_record)
-            self.refresh_data()
+            existing = [run_key(champion, run) for champion, runs in self.game_durations.items()
+                        for run in runs if isinstance(run, dict)]
+            if self.csv_worker.start_import(file_path, existing):
+                self.transfer_action = "Importing"
+            self.poll_csv_worker()
 
     def save_data(self):
-        """Save all game durations to a CSV file."""
+        """Save all game durations to a CSV file on a background thread."""
         file_path = filedialog.asksaveasfilename(defaultextension=".csv",
                                                  filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
         if not file_path:
             return  # User canceled file save
 
-        with open(file_path, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['Champion', 'Duration', 'GameID'])
-
-            for champion, games in self.game_durations.items():
-                for game in games:
-                    writer.writerow([champion, game['duration'], game['game_id']])
-
-        print(f"[INFO] Data saved to {file_path}")
+        # Shallow copies are enough: run records are never modified once stored
+        snapshot = {champion: list(runs) for champion, runs in self.game_durations.items()}
+        if self.csv_worker.start_export(file_path, snapshot):
+            self.transfer_action = "Saving"
+        self.poll_csv_worker()
+
+    def poll_csv_worker(self):
+        """Apply imported chunks and show progress until the worker is done."""
+        finished = False
+        imported = False
+        while True:
+            try:
+                kind, payload = self.csv_worker.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "chunk":
+                if self.import_runs is not None:
+                    self.import_runs(payload)  # saved first, then shown from the RunsImported event
+                else:
+                    self.add_runs(payload)
+                    imported = True
+            elif kind == "progress":
+                self.transfer_label.config(text=f"{self.transfer_action}... {payload:.0%}")
+            else:
+                print(f"[INFO] {payload}" if kind == "done" else f"[ERROR] CSV {payload}")
+                self.transfer_label.config(text=payload)
+                finished = True
+
+        if imported:
+            self.refresh_data()
+        if not finished and not self.stop_event.is_set():
+            self.root.after(100, self.poll_csv_worker)
 
     def stop(self):
         """Stop the application cleanly."""
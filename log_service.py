@@ -0,0 +1,156 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+ROOT = "lor"
+FORMAT = "%(asctime)s [%(levelname)s] %(component)s: %(message)s"
+
+# Pass as `extra` for messages that can repeat every tick (endpoint errors, "In a loading/victory
+# screen") so RepeatFilter rate-limits them; everything else is always logged
+RATE_LIMITED = {"rate_limited": True}
+# The same for counter-style messages ("Deck is missing (%d loops)"), so every count is one message
+REPEAT_BY_TEMPLATE = {"rate_limited": True, "repeat_by_template": True}
+
+# Library default: stay silent until a LogService is started
+logging.getLogger(ROOT).addHandler(logging.NullHandler())
+
+
+def get_logger(component):
+    """Logger for one component ("tracker", "api", ...); dotted names inherit the parent's level."""
+    return logging.getLogger(f"{ROOT}.{component}")
+
+
+def parse_levels(text):
+    """'api=DEBUG,tracker=WARNING' -> {"api": "DEBUG", "tracker": "WARNING"}."""
+    levels = {}
+    for part in filter(None, (part.strip() for part in (text or "").split(","))):
+        component, _, level = part.partition("=")
+        if not level or not isinstance(logging.getLevelName(level.strip().upper()), int):
+            raise ValueError(f"Bad log level '{part}', expected COMPONENT=LEVEL")
+        levels[component.strip()] = level.strip().upper()
+    return levels
+
+
+class ComponentFormatter(logging.Formatter):
+    def format(self, record):
+        record.component = record.name[len(ROOT) + 1:] if record.name.startswith(ROOT + ".") else record.name
+        return super().format(record)
+
+
+class RepeatFilter(logging.Filter):
+    """Lets a rate-limited message through at most once per `interval` seconds.
+
+    Only records logged with extra=RATE_LIMITED or REPEAT_BY_TEMPLATE are
+    limited, so one-off lines such as timer transitions always reach the ring
+    buffer. Messages are matched on logger, level and the formatted text, or
+    on the unformatted template for REPEAT_BY_TEMPLATE, so "Deck is missing
+    (%d loops)" counts as one message whatever the count. The next copy let
+    through notes how many were held back. Runs on the logging thread before
+    anything is queued, so dropped records never reach the writer.
+    """
+
+    def __init__(self, interval=10.0, clock=time.monotonic):
+        super().__init__()
+        self.interval = interval
+        self.clock = clock
+        self.seen = {}  # key -> [last emitted, suppressed since]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, "rate_limited", False):
+            return True
+        text = record.msg
+        if not getattr(record, "repeat_by_template", False):
+            try:
+                text = record.getMessage()
+            except (TypeError, ValueError):
+                pass  # bad arguments; the handler reports those when it formats the record
+        key = (record.name, record.levelno, text)
+        now = self.clock()
+        with self._lock:
+            entry = self.seen.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return False
+            suppressed = entry[1] if entry is not None else 0
+            self.seen[key] = [now, 0]
+            if len(self.seen) > 4096:
+                # Keep memory bounded in long sessions: forget anything outside the window
+                self.seen = {k: v for k, v in self.seen.items() if now - v[0] < self.interval}
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar suppressed)"
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted records in memory."""
+
+    def __init__(self, capacity=2000):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(self.format(record))
+
+    def snapshot(self):
+        with self.lock:  # emit() runs under the same lock on the listener thread
+            return list(self.records)
+
+
+class LogService:
+    """Structured logging for the polling loop.
+
+    Loggers only filter and enqueue; a background listener thread formats
+    records and writes them to the console (and optionally a file) and to an
+    in-memory ring buffer that dump() writes out on demand. Repeats are
+    rate-limited by RepeatFilter, and each component can have its own level.
+    """
+
+    def __init__(self, level="INFO", component_levels=None, ring_size=2000, repeat_interval=10.0,
+                 stream=None, path=None):
+        self.logger = logging.getLogger(ROOT)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
+        for component, component_level in (component_levels or {}).items():
+            get_logger(component).setLevel(component_level)
+
+        formatter = ComponentFormatter(FORMAT, datefmt="%H:%M:%S")
+        self.ring = RingBufferHandler(ring_size)
+        handlers = [logging.StreamHandler(stream or sys.stdout), self.ring]
+        if path:
+            handlers.append(logging.handlers.RotatingFileHandler(path, maxBytes=5_000_000, backupCount=3,
+                                                                 encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        self.queue = queue.SimpleQueue()
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.handler.addFilter(RepeatFilter(repeat_interval))
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers)
+
+    def start(self):
+        self.logger.addHandler(self.handler)
+        self.listener.start()
+        return self
+
+    def stop(self):
+        """Flush everything queued and detach."""
+        self.logger.removeHandler(self.handler)
+        self.listener.stop()
+
+    def set_level(self, component, level):
+        get_logger(component).setLevel(level)
+
+    def recent(self):
+        return self.ring.snapshot()
+
+    def dump(self, path):
+        """Write the ring buffer to `path`."""
+        lines = self.recent()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return len(lines)
@@ -0,0 +1,152 @@
+import bisect
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds: 0.25 ms doubling up to ~33 s
+DEFAULT_BOUNDS = tuple(0.00025 * 2 ** i for i in range(18))
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    """Fixed-bucket histogram; observing a value is a bisect and a few adds."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {"count": self.count, "sum": self.total, "max": self.max,
+                "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99),
+                "buckets": dict(zip([*map(str, self.bounds), "inf"], self.counts))}
+
+
+class MetricsRegistry:
+    """Named counters and histograms for the hot paths.
+
+    Each metric is only ever written by one thread at a time (one request
+    per endpoint per tick, one polling loop, one Tk thread), so updates take
+    no locks. Readers get a point-in-time copy from snapshot().
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, factory):
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self.metrics.setdefault(name, factory())
+        return metric
+
+    def counter(self, name):
+        return self._get(name, Counter)
+
+    def histogram(self, name):
+        return self._get(name, Histogram)
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in sorted(self.metrics.items())}
+
+    def scoped(self, prefix):
+        """View that files every metric under `prefix.` in this registry."""
+        return ScopedRegistry(self, prefix)
+
+
+class ScopedRegistry:
+    """Prefixing view of a MetricsRegistry, so several trackers can share one."""
+
+    def __init__(self, registry, prefix):
+        self.registry = registry
+        self.prefix = prefix
+
+    def counter(self, name):
+        return self.registry.counter(f"{self.prefix}.{name}")
+
+    def histogram(self, name):
+        return self.registry.histogram(f"{self.prefix}.{name}")
+
+    def snapshot(self):
+        start = self.prefix + "."
+        return {name[len(start):]: value for name, value in self.registry.snapshot().items()
+                if name.startswith(start)}
+
+
+# Shared by everything in the process unless a component is handed its own
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """Read-only local HTTP endpoint serving the registry snapshot as JSON at /metrics."""
+
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=21338):
+        self.registry = registry
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True).start()
+        host, port = self.server.server_address[:2]
+        print(f"[INFO] Metrics available at http://{host}:{port}/metrics")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = json.dumps(registry.snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,283 @@
+import asyncio
+import heapq
+import json
+import threading
+import time
+
+from event_bus import ChampionDetected, RunCompleted, RunsImported, StateChanged, TimersChanged, TimersReset
+from log_service import get_logger
+from personal_best import PersonalBests
+
+log = get_logger("overlay")
+
+# Overlay clients that fall this far behind (unsent bytes) are dropped rather than buffered forever
+MAX_BACKLOG = 256 * 1024
+
+OVERLAY_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>LoR Timers</title>
+<style>
+body { margin: 0; font: bold 28px sans-serif; color: white; text-shadow: 2px 2px 3px black; background: transparent; }
+#delta.behind { color: #e74c3c; } #delta.ahead { color: #2ecc71; }
+#recent { font-size: 18px; }
+</style></head>
+<body>
+<div id="champion">-</div>
+<div>Run <span id="run">0:00</span> <span id="delta"></span></div>
+<div>Menus <span id="menu">0:00</span></div>
+<div id="recent"></div>
+<script>
+let state = {}, skew = 0;
+const fmt = s => { s = Math.floor(Math.abs(s)); return Math.floor(s / 60) + ":" + String(s % 60).padStart(2, "0"); };
+function apply(message) {
+  Object.assign(state, message.changes || message.state);
+  skew = message.now - Date.now() / 1000;
+  document.getElementById("champion").textContent = state.champion || "-";
+  document.getElementById("recent").innerHTML = (state.recent || [])
+    .map(r => r.champion + " " + fmt(r.duration)).join("<br>");
+}
+function tick() {
+  const now = Date.now() / 1000 + skew;
+  const run = state.champion_start ? now - state.champion_start : (state.champion_duration || 0);
+  const menu = (state.menu_duration || 0) + (state.menu_start ? now - state.menu_start : 0);
+  document.getElementById("run").textContent = fmt(run);
+  document.getElementById("menu").textContent = fmt(menu);
+  const delta = document.getElementById("delta");
+  if (state.pb && (state.champion_start || state.champion_duration)) {
+    // The delta at the last split, or live once the run is past the PB's time for this split
+    const live = run - state.pb.split;
+    const split = state.pb.previous === null ? live : (state.segment_start || 0) - state.pb.previous;
+    const d = live > 0 ? Math.max(split, live) : split;
+    delta.textContent = (d > 0 ? "+" : "-") + fmt(d);
+    delta.className = d > 0 ? "behind" : "ahead";
+  } else {
+    delta.textContent = "";
+  }
+}
+const source = new EventSource("/events");
+source.addEventListener("state", e => apply(JSON.parse(e.data)));
+source.addEventListener("diff", e => apply(JSON.parse(e.data)));
+setInterval(tick, 100);
+</script></body></html>
+"""
+
+
+class OverlayServer:
+    """Pushes live timer state to stream overlays over Server-Sent Events.
+
+    The server takes a single EventBus subscription however many overlays
+    connect, so it never adds work to LoRTimers or requests to the client
+    API. When an event changes the state, only the changed keys go out, and
+    each message is encoded once and written to every connection. Idle
+    connections get an SSE comment as a heartbeat. Running timers are sent as
+    start times so overlays tick on their own between messages.
+
+    GET / serves a ready-made overlay page, /events is the SSE stream and
+    /state returns the full state as JSON.
+    """
+
+    def __init__(self, event_bus, game_durations=None, host="127.0.0.1", port=21339,
+                 heartbeat_interval=15.0, pump_interval=0.05, recent_runs=10, time_source=time.time):
+        self.host = host
+        self.port = port
+        self.heartbeat_interval = heartbeat_interval
+        self.pump_interval = pump_interval
+        self.recent_runs = recent_runs
+        self.time_source = time_source
+
+        self.events = event_bus.subscribe()
+        self.events.on(StateChanged, self.on_state_changed)
+        self.events.on(ChampionDetected, self.on_champion_detected)
+        self.events.on(TimersChanged, self.on_timers_changed)
+        self.events.on(RunCompleted, self.on_run_completed)
+        self.events.on(TimersReset, self.on_timers_reset)
+        self.events.on(RunsImported, self.on_runs_imported)
+
+        self.personal_bests = PersonalBests.from_durations(game_durations or {})
+        self.state = {"game_state": None, "champion": None, "champion_start": None, "champion_duration": 0,
+                      "menu_start": None, "menu_duration": 0, "segment": 0, "segment_start": 0.0,
+                      "pb": None, "recent": []}
+        # Seed the recent results with the latest timestamped runs on record
+        runs = ((run.get("timestamp"), champion, run) for champion, runs in (game_durations or {}).items()
+                for run in runs if isinstance(run, dict) and run.get("timestamp"))
+        self.state["recent"] = [{"champion": champion, "duration": run["duration"], "timestamp": timestamp}
+                                for timestamp, champion, run in heapq.nlargest(recent_runs, runs, key=lambda r: r[0])]
+        self.changes = {}
+        self.clients = set()
+        self.server = None
+        self.loop = None
+        self.thread = None
+        self._stopping = None
+
+    # Event handlers: fold events into the state, remembering which keys moved
+
+    def _set(self, key, value):
+        if self.state[key] != value:
+            self.state[key] = value
+            self.changes[key] = value
+
+    def _update_pb(self):
+        table = self.personal_bests.get(self.state["champion"])
+        if table is None or table.pb is None:
+            self._set("pb", None)
+            return
+        segment = self.state["segment"]
+        if segment >= len(table.pb_cumulative):
+            split, previous = table.pb, None  # the PB run was already over by now
+        else:
+            split, previous = table.pb_cumulative[segment], table.pb_cumulative[segment - 1] if segment else 0.0
+        self._set("pb", {"time": table.pb, "sum_of_best": table.sum_of_best, "split": split, "previous": previous})
+
+    def on_state_changed(self, event):
+        self._set("game_state", event.current)
+
+    def on_champion_detected(self, event):
+        self._set("champion", event.champion)
+        self._update_pb()
+
+    def on_timers_changed(self, event):
+        self._set("champion_start", event.champion_start)
+        self._set("champion_duration", event.champion_duration)
+        self._set("menu_start", event.menu_start)
+        self._set("menu_duration", event.menu_duration)
+        self._set("segment", event.segment)
+        self._set("segment_start", event.segment_start)
+        self._update_pb()
+
+    def on_run_completed(self, event):
+        record = event.record
+        run = {"champion": event.champion, "duration": record["duration"], "timestamp": record.get("timestamp")}
+        self._set("recent", ([run] + self.state["recent"])[:self.recent_runs])
+        self.personal_bests.record(event.champion, record)
+        self._update_pb()
+
+    def on_runs_imported(self, event):
+        # Old runs: they can set a PB but don't belong in the recent results
+        for champion, record in event.runs:
+            self.personal_bests.record(champion, record)
+        self._update_pb()
+
+    def on_timers_reset(self, event):
+        self._set("segment", 0)
+        self._set("segment_start", 0.0)
+
+    def snapshot(self):
+        """The full state plus the derived live times, as of now."""
+        now = self.time_source()
+        state = self.state
+        champion_time = now - state["champion_start"] if state["champion_start"] else state["champion_duration"]
+        menu_time = state["menu_duration"] + (now - state["menu_start"] if state["menu_start"] else 0)
+        return {"now": now, "state": dict(state),
+                "current_champion_time": champion_time, "total_menu_time": menu_time}
+
+    # Serving
+
+    def _encode(self, event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode("utf-8")
+
+    def _broadcast(self, message):
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                log.warning("Dropping an overlay client that stopped reading.")
+                self._drop(writer)
+                continue
+            writer.write(message)
+
+    def _drop(self, writer):
+        self.clients.discard(writer)
+        writer.close()
+
+    async def _pump(self):
+        while True:
+            if self.events.dispatch() and self.changes:
+                changes, self.changes = self.changes, {}
+                if self.clients:
+                    snapshot = self.snapshot()
+                    self._broadcast(self._encode("diff", {
+                        "now": snapshot["now"], "changes": changes,
+                        "current_champion_time": snapshot["current_champion_time"],
+                        "total_menu_time": snapshot["total_menu_time"]}))
+            await asyncio.sleep(self.pump_interval)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self._broadcast(b": ping\n\n")
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            parts = request_line.decode("latin-1").split()
+            method, path = (parts[0], parts[1].split("?")[0]) if len(parts) >= 2 else ("", "")
+        except (ConnectionError, asyncio.IncompleteReadError, UnicodeDecodeError):
+            writer.close()
+            return
+
+        if method != "GET":
+            self._respond(writer, "405 Method Not Allowed", "text/plain", b"Method not allowed")
+        elif path == "/events":
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\n\r\nretry: 1000\n\n")
+            writer.write(self._encode("state", self.snapshot()))
+            self.clients.add(writer)
+            try:
+                await reader.read()  # overlays never send anything; this returns when they go away
+            except ConnectionError:
+                pass
+            self._drop(writer)
+        elif path == "/state":
+            self._respond(writer, "200 OK", "application/json", json.dumps(self.snapshot()).encode("utf-8"))
+        elif path == "/":
+            self._respond(writer, "200 OK", "text/html; charset=utf-8", OVERLAY_PAGE.encode("utf-8"))
+        else:
+            self._respond(writer, "404 Not Found", "text/plain", b"Not found")
+
+    def _respond(self, writer, status, content_type, body):
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                     f"Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        writer.close()
+
+    async def serve(self):
+        """Run on the current event loop until cancelled or stop() is called."""
+        self.loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        log.info("Overlay available at http://%s:%d/", self.host, self.port)
+        tasks = [asyncio.ensure_future(self._pump()), asyncio.ensure_future(self._heartbeat())]
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.server.close()
+            for writer in list(self.clients):
+                self._drop(writer)
+
+    def start(self):
+        """Serve from a background thread with its own event loop."""
+        started = threading.Event()
+
+        def run():
+            async def main():
+                serving = asyncio.ensure_future(self.serve())
+                while self.server is None and not serving.done():
+                    await asyncio.sleep(0.01)
+                started.set()
+                try:
+                    await serving
+                except OSError as e:
+                    log.error("Could not start the overlay server on port %d: %s", self.port, e)
+            asyncio.run(main())
+
+        self.thread = threading.Thread(target=run, name="overlay-server", daemon=True)
+        self.thread.start()
+        started.wait(timeout=5)
+        return self
+
+    def stop(self):
+        if self.loop is not None and self._stopping is not None:
+            self.loop.call_soon_threadsafe(self._stopping.set)
+        if self.thread is not None:
+            self.thread.join(timeout=5)
@@ -0,0 +1,95 @@
+from itertools import accumulate
+
+
+def run_segments(record):
+    """Segment times of a saved run, one per game, or None if it was recorded without splits."""
+    games = record.get("splits") if isinstance(record, dict) else None
+    if games:
+        segments = [sum(round_split["duration"] or 0.0 for round_split in rounds) for rounds in games]
+        if all(segments):
+            return segments
+    return None
+
+
+class SplitTable:
+    """Personal best and best-ever segments for one champion.
+
+    The PB's cumulative split times are kept as a list, so the live delta is
+    a couple of index lookups however many runs are on record. Only
+    runs recorded with splits feed the best segments (a run without them is a
+    single segment as long as the whole run), and sum of best is None unless
+    the PB itself has splits.
+    """
+
+    __slots__ = ("pb", "pb_cumulative", "pb_has_splits", "best_segments", "sum_of_best")
+
+    def __init__(self):
+        self.pb = None
+        self.pb_cumulative = []
+        self.pb_has_splits = False
+        self.best_segments = []
+        self.sum_of_best = None
+
+    def add(self, duration, segments=None):
+        """Fold in one run (segments None when it has no splits); returns True if it is a new personal best."""
+        for index, segment in enumerate(segments or ()):
+            if index == len(self.best_segments):
+                self.best_segments.append(segment)
+            elif segment < self.best_segments[index]:
+                self.best_segments[index] = segment
+
+        new_pb = self.pb is None or duration < self.pb
+        if new_pb:
+            self.pb = duration
+            self.pb_cumulative = list(accumulate(segments or [duration]))
+            self.pb_cumulative[-1] = duration  # the run total is authoritative for the final split
+            self.pb_has_splits = segments is not None
+        self.sum_of_best = sum(self.best_segments[:len(self.pb_cumulative)]) if self.pb_has_splits else None
+        return new_pb
+
+    def delta(self, elapsed, segment=0, segment_start=0.0):
+        """Seconds behind (positive) or ahead (negative) of the PB at the same point of the run.
+
+        `segment` games are already behind us and the current one started at
+        `segment_start` into the run. Like a split timer, this is the delta at
+        the last completed split until `elapsed` passes the PB's time for the
+        current split, and live from then on.
+        """
+        if self.pb is None:
+            return None
+        last = len(self.pb_cumulative) - 1
+        if segment > last:
+            return elapsed - self.pb  # the PB run was already over by now
+        split = segment_start - self.pb_cumulative[segment - 1] if segment else 0.0
+        live = elapsed - self.pb_cumulative[segment]
+        return max(split, live) if live > 0 else split
+
+
+class PersonalBests:
+    """Per-champion SplitTables, built from the run history and updated per completed run."""
+
+    def __init__(self):
+        self.tables = {}
+
+    @classmethod
+    def from_durations(cls, game_durations):
+        bests = cls()
+        for champion, runs in game_durations.items():
+            for run in runs:
+                bests.record(champion, run)
+        return bests
+
+    def record(self, champion, record):
+        """Add a completed run; returns True if it set a new personal best."""
+        duration = record["duration"] if isinstance(record, dict) else record
+        return self.tables.setdefault(champion, SplitTable()).add(duration, run_segments(record))
+
+    def get(self, champion):
+        return self.tables.get(champion)
+
+    def delta(self, champion, elapsed, segment=0, segment_start=0.0):
+        table = self.tables.get(champion)
+        return table.delta(elapsed, segment, segment_start) if table else None
+
+    def clear(self):
+        self.tables.clear()
@@ -0,0 +1,71 @@
+class PollScheduler:
+    """Decides how long run_game_loop sleeps and which endpoints each tick fetches.
+
+    Polling speeds up into a short burst whenever something is happening (a
+    state or game ID change, a pending deck, the deck-missing watchdog) and
+    slowly backs off once the game has sat in the same state for a while.
+    Outside of a burst every endpoint keeps its own cadence, so slow-moving
+    endpoints such as game-result are only fetched occasionally.
+    """
+
+    def __init__(self, endpoints, state_intervals=None, default_interval=0.5,
+                 burst_interval=0.2, burst_duration=3.0,
+                 stable_after=30.0, stable_interval=1.0, endpoint_intervals=None):
+        self.endpoints = tuple(endpoints)
+        self.state_intervals = state_intervals or {}
+        self.default_interval = default_interval
+        self.burst_interval = burst_interval
+        self.burst_duration = burst_duration
+        self.stable_after = stable_after
+        self.stable_interval = stable_interval
+
+        # Longest time an endpoint may go unpolled outside a burst; None polls it every tick
+        self.endpoint_intervals = endpoint_intervals or {}
+
+        self.state = None
+        self.stable_since = None
+        self.burst_until = 0.0
+        self.last_polled = {}
+
+    def in_burst(self, now):
+        return now < self.burst_until
+
+    def trigger_burst(self, now):
+        """Poll every endpoint at the burst rate for the next burst_duration seconds."""
+        self.burst_until = max(self.burst_until, now + self.burst_duration)
+        self.stable_since = now
+
+    def observe(self, now, state, activity=False):
+        """Feed the result of a tick: the current game state and whether anything needs watching."""
+        if state != self.state:
+            self.state = state
+            activity = True
+        if activity:
+            self.trigger_burst(now)
+
+    def interval(self, now):
+        """Seconds to wait before the next tick."""
+        if self.in_burst(now):
+            return self.burst_interval
+
+        interval = self.state_intervals.get(self.state, self.default_interval)
+        if self.stable_since is not None and now - self.stable_since >= self.stable_after:
+            interval = max(interval, self.stable_interval)
+        return interval
+
+    def due_endpoints(self, now):
+        """Endpoints that should be fetched on a tick starting at `now`."""
+        if self.in_burst(now):
+            return self.endpoints
+
+        due = []
+        for endpoint in self.endpoints:
+            cadence = self.endpoint_intervals.get(endpoint)
+            last = self.last_polled.get(endpoint)
+            if cadence is None or last is None or now - last >= cadence:
+                due.append(endpoint)
+        return tuple(due)
+
+    def mark_polled(self, endpoints, now):
+        for endpoint in endpoints:
+            self.last_polled[endpoint] = now
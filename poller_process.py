@@ -0,0 +1,269 @@
+import math
+import multiprocessing
+import struct
+import threading
+from multiprocessing import shared_memory
+
+from event_bus import (ChampionDetected, EventBus, RunCompleted, RunsImported, StateChanged, TimersChanged,
+                       TimersReset)
+from log_service import LogService, get_logger
+
+log = get_logger("poller")
+
+# Shared timer state: a sequence number followed by one fixed-layout record.
+# champion_start, champion_duration, menu_start, menu_duration (NaN for "not running"),
+# segment_start, segment, then the game state and champion name as NUL-padded UTF-8
+SEQUENCE = struct.Struct("<Q")
+STATE = struct.Struct("<5dI16s64s")
+BLOCK_SIZE = SEQUENCE.size + STATE.size
+
+
+def _text(value, size):
+    return (value or "").encode("utf-8")[:size]
+
+
+class TimerStateBlock:
+    """Seqlock-protected timer state in shared memory.
+
+    There is exactly one writer. It bumps the sequence number to an odd
+    value, writes the record in place, then bumps it to the next even
+    value. Readers never take a lock: they read the sequence, unpack the
+    record straight out of the shared buffer and read the sequence again,
+    retrying if a write was in progress or slipped in between.
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.sequence = SEQUENCE.unpack_from(shm.buf, 0)[0]  # carry on from whoever wrote last
+
+    @classmethod
+    def create(cls):
+        block = cls(shared_memory.SharedMemory(create=True, size=BLOCK_SIZE), owner=True)
+        block.write(None, 0, None, 0, 0, 0.0, None, None)
+        return block
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the block for cleanup as well; child
+            # processes share the owner's resource tracker, so that registration is the
+            # owner's own and goes away when it unlinks the block
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, champion_start, champion_duration, menu_start, menu_duration, segment, segment_start,
+              game_state, champion):
+        buf = self.shm.buf
+        self.sequence += 1
+        SEQUENCE.pack_into(buf, 0, self.sequence)  # odd: write in progress
+        STATE.pack_into(buf, SEQUENCE.size,
+                        math.nan if champion_start is None else champion_start, champion_duration,
+                        math.nan if menu_start is None else menu_start, menu_duration, segment_start,
+                        segment, _text(game_state, 16), _text(champion, 64))
+        self.sequence += 1
+        SEQUENCE.pack_into(buf, 0, self.sequence)
+
+    def read(self, attempts=100):
+        """Return (sequence, TimersChanged, game state, champion) from a consistent snapshot.
+
+        Returns None if no consistent snapshot turned up in `attempts` tries; a
+        write takes microseconds, so that means the writer died mid-write.
+        """
+        buf = self.shm.buf
+        for _ in range(attempts):
+            before = SEQUENCE.unpack_from(buf, 0)[0]
+            if before & 1:
+                continue
+            fields = STATE.unpack_from(buf, SEQUENCE.size)
+            if SEQUENCE.unpack_from(buf, 0)[0] == before:
+                break
+        else:
+            return None
+        (champion_start, champion_duration, menu_start, menu_duration, segment_start, segment,
+         game_state, champion) = fields
+        timers = TimersChanged(None if math.isnan(champion_start) else champion_start, champion_duration,
+                               None if math.isnan(menu_start) else menu_start, menu_duration, segment, segment_start)
+        return (before, timers, game_state.rstrip(b"\0").decode("utf-8", errors="replace") or None,
+                champion.rstrip(b"\0").decode("utf-8", errors="replace") or None)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def run_poller(block_name, conn, stop_event, options):
+    """Entry point of the poller process: run LoRTimers and mirror its state into the shared block."""
+    from api_caller import APICaller
+    from board_diff import SplitTracker
+    from LoR_Timers import LoRTimers
+    from metrics import REGISTRY, MetricsServer
+    from run_journal import RunJournal, user_data_path
+
+    log_service = LogService(options.get("log_level", "INFO"), options.get("log_levels"),
+                             path=options.get("log_file")).start()
+    block = TimerStateBlock.attach(block_name)
+    api = APICaller(None, None, base_url=options.get("base_url", "http://127.0.0.1:21337"))
+    if options.get("metrics_port"):
+        MetricsServer(port=options["metrics_port"]).start()
+    recorder = None
+    if options.get("record"):
+        from session_replay import SessionRecorder
+        recorder = api.recorder = SessionRecorder(options["record"])
+    journal = RunJournal(options.get("journal") or user_data_path("game_durations.json"))
+    bus = EventBus()
+    game = LoRTimers(api, threading.Event(), options.get("data_folder", "Data"), journal=journal, event_bus=bus,
+                     split_tracker=SplitTracker() if options.get("splits") else None)
+
+    # Timer state goes into the block; completed runs and resets go over the pipe in order
+    events = bus.subscribe()
+    state = {"timers": TimersChanged(None, 0, None, 0), "game_state": None, "champion": None}
+    events.on(TimersChanged, lambda event: state.update(timers=event))
+    events.on(StateChanged, lambda event: state.update(game_state=event.current))
+    events.on(ChampionDetected, lambda event: state.update(champion=event.champion))
+    events.on(RunCompleted, lambda event: conn.send(("run", event.champion, event.record)))
+    events.on(TimersReset, lambda event: conn.send(("reset",)))
+    events.on(RunsImported, lambda event: conn.send(("imported", event.runs)))
+
+    conn.send(("history", game.game_durations))
+    published = None
+    try:
+        while not stop_event.is_set():
+            while conn.poll():
+                message = conn.recv()
+                if message[0] == "restart":
+                    game.request_restart()
+                elif message[0] == "clear_mapping":
+                    game.champion_mapping.clear()
+                elif message[0] == "import":
+                    game.import_runs(message[1])
+                elif message[0] == "metrics":
+                    conn.send(("metrics", REGISTRY.snapshot()))
+
+            game.begin_tick()
+            game.update_game_state()
+            events.dispatch()
+            snapshot = (*state["timers"], state["game_state"], state["champion"])
+            if snapshot != published:
+                block.write(*snapshot)
+                published = snapshot
+            stop_event.wait(game.end_tick())
+    except (EOFError, BrokenPipeError):
+        log.warning("Lost the GUI process, stopping.")
+    finally:
+        api.close()
+        journal.close()
+        if recorder:
+            recorder.close()
+        block.close()
+        log_service.stop()
+
+
+class PollerProcess:
+    """Runs the tracker in its own process and replays its state as local events.
+
+    The GUI keeps its usual EventBus subscription; poll() (called from the Tk
+    loop) reads the shared block lock-free and publishes TimersChanged,
+    StateChanged and ChampionDetected when the sequence number has moved, and
+    forwards completed runs and resets from the pipe. Neither process can
+    stall the other: the poller never waits on the GUI and the GUI never
+    waits on a tick. Fetch and loop metrics live in the poller too; metrics()
+    hands out the latest snapshot it sent over.
+    """
+
+    def __init__(self, event_bus, **options):
+        self.event_bus = event_bus
+        self.options = options
+        self.block = None
+        self.conn = None
+        self.process = None
+        self.stop_event = multiprocessing.Event()
+        self.sequence = None
+        self.published = (None, None, None)
+        self.lost = False
+        self.metrics_snapshot = None
+
+    def start(self, timeout=30):
+        """Start the poller and return the run history it loaded."""
+        self.block = TimerStateBlock.create()
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=run_poller, name="lor-poller",
+                                               args=(self.block.name, child_conn, self.stop_event, self.options),
+                                               daemon=True)
+        self.process.start()
+        child_conn.close()
+        if not self.conn.poll(timeout):
+            raise RuntimeError("Poller process did not start")
+        kind, history = self.conn.recv()
+        return history
+
+    def poll(self):
+        """Publish whatever changed in the poller since the last call."""
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == "run":
+                    self.event_bus.publish(RunCompleted(message[1], message[2]))
+                elif message[0] == "reset":
+                    self.event_bus.publish(TimersReset())
+                elif message[0] == "imported":
+                    self.event_bus.publish(RunsImported(message[1]))
+                elif message[0] == "metrics":
+                    self.metrics_snapshot = message[1]
+        except (EOFError, OSError):
+            pass  # the poller went away; stop() cleans up
+        if not self.lost and not self.process.is_alive():
+            self.lost = True
+            log.error("Poller process exited (code %s); timers will not update.", self.process.exitcode)
+
+        snapshot = self.block.read()
+        if snapshot is None:
+            return  # torn by a poller that died mid-write; keep showing what we last published
+        sequence, timers, game_state, champion = snapshot
+        if sequence == self.sequence:
+            return
+        self.sequence = sequence
+        previous_timers, previous_state, previous_champion = self.published
+        if game_state != previous_state:
+            self.event_bus.publish(StateChanged(previous_state, game_state))
+        if champion != previous_champion:
+            self.event_bus.publish(ChampionDetected(champion))
+        if timers != previous_timers:
+            self.event_bus.publish(timers)
+        self.published = (timers, game_state, champion)
+
+    def _send(self, message):
+        try:
+            self.conn.send(message)
+        except OSError:
+            log.warning("Poller process is gone, could not send '%s'.", message[0])
+
+    def request_restart(self):
+        self._send(("restart",))
+
+    def clear_mapping(self):
+        self._send(("clear_mapping",))
+
+    def import_runs(self, runs):
+        self._send(("import", list(runs)))
+
+    def metrics(self):
+        """Latest metrics snapshot from the poller (None before the first), and ask for a fresh one."""
+        self._send(("metrics",))
+        return self.metrics_snapshot
+
+    def stop(self):
+        self.stop_event.set()
+        if self.process is not None:
+            self.process.join(timeout=10)
+        if self.conn is not None:
+            self.conn.close()
+        if self.block is not None:
+            self.block.close()
@@ -0,0 +1,181 @@
+import datetime
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400.0
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+# 1970-01-01 was a Thursday; shift so weeks start on Monday
+WEEK_OFFSET = 3 * SECONDS_PER_DAY
+
+
+def parse_timestamp(value):
+    """Epoch seconds from a record timestamp (ISO string or number), NaN if missing or unreadable."""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class RunHistory:
+    """Columnar run history for vectorized queries.
+
+    Runs live in parallel NumPy columns (champion id, timestamp, duration,
+    time carried over from lost games, error bound) that grow by doubling, so
+    appending a run is amortized O(1) and every query is a handful of array
+    operations over the filled prefix. Runs without a timestamp (older files)
+    keep NaN there and are left out of date-based queries.
+    """
+
+    COLUMNS = (("champion_ids", np.int32), ("timestamps", np.float64), ("durations", np.float64),
+               ("carried", np.float64), ("errors", np.float64))
+
+    def __init__(self, capacity=1024):
+        self.champions = []
+        self.champion_index = {}
+        self.size = 0
+        for name, dtype in self.COLUMNS:
+            setattr(self, "_" + name, np.empty(capacity, dtype=dtype))
+
+    @classmethod
+    def from_durations(cls, game_durations):
+        history = cls(max(1024, sum(len(runs) for runs in game_durations.values())))
+        for champion, runs in game_durations.items():
+            history.extend(champion, runs)
+        return history
+
+    def __len__(self):
+        return self.size
+
+    def _column(self, name):
+        return getattr(self, "_" + name)[:self.size]
+
+    @property
+    def champion_ids(self):
+        return self._column("champion_ids")
+
+    @property
+    def timestamps(self):
+        return self._column("timestamps")
+
+    @property
+    def durations(self):
+        return self._column("durations")
+
+    @property
+    def carried(self):
+        return self._column("carried")
+
+    @property
+    def errors(self):
+        return self._column("errors")
+
+    def _champion_id(self, champion):
+        champion_id = self.champion_index.get(champion)
+        if champion_id is None:
+            champion_id = self.champion_index[champion] = len(self.champions)
+            self.champions.append(champion)
+        return champion_id
+
+    def _reserve(self, count):
+        needed = self.size + count
+        capacity = len(self._durations)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, _ in self.COLUMNS:
+            column = getattr(self, "_" + name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, "_" + name, grown)
+
+    def extend(self, champion, runs):
+        """Append runs (records, or bare durations from old files) for one champion."""
+        runs = list(runs)
+        self._reserve(len(runs))
+        start, end = self.size, self.size + len(runs)
+        self._champion_ids[start:end] = self._champion_id(champion)
+        self._timestamps[start:end] = [parse_timestamp(run.get("timestamp")) if isinstance(run, dict) else np.nan
+                                       for run in runs]
+        self._durations[start:end] = [run["duration"] if isinstance(run, dict) else run for run in runs]
+        self._carried[start:end] = [run.get("carried", 0.0) if isinstance(run, dict) else 0.0 for run in runs]
+        self._errors[start:end] = [run.get("error", 0.0) if isinstance(run, dict) else 0.0 for run in runs]
+        self.size = end
+
+    def append(self, champion, record):
+        self.extend(champion, (record,))
+
+    def clear(self):
+        self.champions = []
+        self.champion_index = {}
+        self.size = 0
+
+    def mask(self, champion=None, start=None, end=None):
+        """Boolean mask of runs for `champion` (all when None) between the `start` and `end` epoch times."""
+        selected = np.ones(self.size, dtype=bool)
+        if champion is not None:
+            champion_id = self.champion_index.get(champion)
+            if champion_id is None:
+                return np.zeros(self.size, dtype=bool)
+            selected &= self.champion_ids == champion_id
+        if start is not None:
+            selected &= self.timestamps >= start  # NaN compares False, so undated runs drop out
+        if end is not None:
+            selected &= self.timestamps < end
+        return selected
+
+    def durations_for(self, champion=None, start=None, end=None):
+        """Durations matching the filter, in the order they were recorded."""
+        return self.durations[self.mask(champion, start, end)]
+
+    def rolling_average(self, champion=None, window=10):
+        """Mean of each run and the `window - 1` runs before it (fewer at the start)."""
+        durations = self.durations_for(champion)
+        if not len(durations):
+            return durations
+        sums = np.cumsum(durations)
+        sums[window:] = sums[window:] - sums[:-window]
+        counts = np.minimum(np.arange(1, len(durations) + 1), window)
+        return sums / counts
+
+    def best_of(self, n, champion=None, start=None, end=None):
+        """The `n` fastest durations, fastest first."""
+        durations = self.durations_for(champion, start, end)
+        if len(durations) > n:
+            durations = np.partition(durations, n - 1)[:n]
+        return np.sort(durations)
+
+    def best_per_champion(self, start=None, end=None):
+        """{champion: fastest duration} over the filtered runs."""
+        selected = self.mask(start=start, end=end)
+        ids = self.champion_ids[selected]
+        if not len(ids):
+            return {}
+        best = np.full(len(self.champions), np.inf)
+        np.minimum.at(best, ids, self.durations[selected])
+        return {self.champions[i]: float(best[i]) for i in np.flatnonzero(np.isfinite(best))}
+
+    def weekly_trend(self, champion=None, start=None, end=None):
+        """Per calendar week (Monday start, UTC): week start epochs, run counts, mean and best durations."""
+        selected = self.mask(champion, start, end) & ~np.isnan(self.timestamps)
+        timestamps = self.timestamps[selected]
+        durations = self.durations[selected]
+        if not len(timestamps):
+            empty = np.empty(0)
+            return empty, np.empty(0, dtype=np.int64), empty, empty
+        weeks = np.floor((timestamps + WEEK_OFFSET) / SECONDS_PER_WEEK).astype(np.int64)
+        order = np.argsort(weeks, kind="stable")
+        weeks, durations = weeks[order], durations[order]
+        week_ids, starts, counts = np.unique(weeks, return_index=True, return_counts=True)
+        means = np.add.reduceat(durations, starts) / counts
+        best = np.minimum.reduceat(durations, starts)
+        return week_ids * SECONDS_PER_WEEK - WEEK_OFFSET, counts, means, best
+
+    def loss_share(self, champion=None):
+        """Fraction of the filtered runs that carried time over from a lost game."""
+        carried = self.carried[self.mask(champion)]
+        return float(np.count_nonzero(carried)) / len(carried) if len(carried) else 0.0
@@ -0,0 +1,185 @@
+import json
+import os
+import queue
+import threading
+
+
+def user_data_path(filename):
+    """Default home for run data: %APPDATA%\\LoR_Timers on Windows, $XDG_DATA_HOME/lor_timers elsewhere."""
+    if os.name == "nt":
+        folder = os.path.join(os.environ.get("APPDATA") or os.path.expanduser("~"), "LoR_Timers")
+    else:
+        folder = os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "lor_timers")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
+
+
+class RunJournal:
+    """Crash-safe persistence for completed runs.
+
+    Every run is appended to a journal file as one JSON line by a background
+    writer thread, and the journal is fsynced once per batch, so saving never
+    blocks the polling thread and a crash loses at most the last batch.
+    Startup loads the compacted snapshot (the game_durations.json format) and
+    replays the journal on top of it. Once the journal grows past
+    `compact_after` lines the writer folds it into a fresh snapshot.
+
+    Every journaled run gets an increasing "seq", kept in the snapshot too,
+    so a crash between writing the snapshot and truncating the journal can't
+    replay runs the snapshot already holds. A torn final line is cut off at
+    startup so new runs never get appended onto it.
+
+    If `stats_source` is set, the per-champion statistics it returns are
+    written to `stats_path` alongside every snapshot.
+    """
+
+    def __init__(self, snapshot_path="game_durations.json", journal_path=None, stats_path=None,
+                 batch_size=16, batch_interval=1.0, compact_after=500):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + ".journal"
+        self.stats_path = stats_path or os.path.splitext(snapshot_path)[0] + ".stats.json"
+        self.stats_source = None
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.compact_after = compact_after
+
+        self.game_durations = {}
+        self._sequence = 0  # seq of the last run written
+        self._journal_lines = 0
+        self._queue = queue.Queue()
+        self._closed = threading.Event()
+        self._writer = None
+
+    def load(self):
+        """Rebuild game durations from the snapshot plus the journal and start the writer."""
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                try:
+                    self.game_durations = json.load(f)
+                except json.JSONDecodeError:
+                    print(f"[ERROR] Could not decode snapshot '{self.snapshot_path}'. Starting empty.")
+                    self.game_durations = {}
+
+        # Runs up to this seq are already in the snapshot
+        compacted = max((run.get("seq", 0) for runs in self.game_durations.values() for run in runs
+                         if isinstance(run, dict)), default=0)
+        self._sequence = compacted
+        if os.path.exists(self.journal_path):
+            self._replay_journal(compacted)
+
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name="run-journal", daemon=True)
+            self._writer.start()
+
+        # Hand back a copy so the writer's view is never mutated by the caller
+        return {champion: list(runs) for champion, runs in self.game_durations.items()}
+
+    def _replay_journal(self, compacted):
+        with open(self.journal_path, "rb") as f:
+            data = f.read()
+        offset = complete = 0
+        for line in data.splitlines(keepends=True):
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write, nothing after it was synced
+                print("[WARNING] Skipping damaged journal line.")
+                continue
+            complete = offset
+            self._journal_lines += 1
+            seq = entry.get("seq")
+            if seq is not None and seq <= compacted:
+                continue  # compacted just before a crash, before the journal was truncated
+            self._sequence = max(self._sequence, seq or 0)
+            champion = entry.pop("champion")
+            self.game_durations.setdefault(champion, []).append(entry)
+
+        if complete < len(data) or not data.endswith(b"\n"):
+            # Cut the damaged tail off (or finish the last line) so the next append starts a fresh line
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(complete)
+                if complete and not data[:complete].endswith(b"\n"):
+                    f.seek(complete)
+                    f.write(b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def append(self, champion, record):
+        """Queue a completed run for writing. Never blocks."""
+        self._queue.put((champion, dict(record)))
+
+    def compact(self):
+        """Ask the writer to fold the journal into the snapshot."""
+        self._queue.put(None)
+
+    def close(self):
+        """Flush anything queued, compact, and stop the writer."""
+        if self._writer is None:
+            return
+        self._closed.set()
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        self._writer = None
+
+    def _run_writer(self):
+        with open(self.journal_path, "a", encoding="utf-8") as journal:
+            while True:
+                batch, compact = self._collect_batch()
+                if batch:
+                    for champion, record in batch:
+                        self._sequence += 1
+                        record["seq"] = self._sequence
+                        journal.write(json.dumps({"champion": champion, **record}) + "\n")
+                        self.game_durations.setdefault(champion, []).append(record)
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                    self._journal_lines += len(batch)
+
+                if self._journal_lines and (compact or self._journal_lines >= self.compact_after):
+                    self._write_snapshot()
+                    journal.seek(0)
+                    journal.truncate()
+                    os.fsync(journal.fileno())
+                    self._journal_lines = 0
+
+                if self._closed.is_set() and self._queue.empty():
+                    return
+
+    def _collect_batch(self):
+        """Block for the first record, then gather whatever else arrives within the batch window."""
+        batch = []
+        compact = False
+        try:
+            item = self._queue.get(timeout=self.batch_interval)
+        except queue.Empty:
+            return batch, compact
+
+        while True:
+            if item is None:
+                compact = True
+            else:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self._queue.get(timeout=self.batch_interval if batch else 0)
+            except queue.Empty:
+                break
+        return batch, compact
+
+    def _write_snapshot(self):
+        """Atomically replace the snapshot (and stats, if any) with the current state."""
+        if self.stats_source is not None:
+            _atomic_write_json(self.stats_path, self.stats_source())
+        _atomic_write_json(self.snapshot_path, self.game_durations)
+        print(f"[INFO] Compacted run journal into '{self.snapshot_path}'.")
+
+
+def _atomic_write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
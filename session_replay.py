@@ -0,0 +1,162 @@
+import argparse
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from api_caller import APICaller, UNCHANGED
+from client_emulator import scenario_payload, step_at
+from deck_resolver import load_json
+from LoR_Timers import LoRTimers
+
+
+class SessionRecorder:
+    """Writes every new LoR client payload to a gzipped JSON-lines session file.
+
+    One line per tick: ``[timestamp, {endpoint: raw payload text}]``. Only
+    payloads that differ from the endpoint's previous response are stored,
+    so long stretches of identical responses cost a few bytes per tick. An
+    endpoint the client did not answer is stored as null.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+
+    def record_tick(self, timestamp, payloads):
+        self.file.write(json.dumps([round(timestamp, 4), payloads], separators=(",", ":")) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def load_session(path):
+    """Return the recorded ticks as a list of (timestamp, {endpoint: raw payload text})."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [tuple(json.loads(line)) for line in f if line.strip()]
+
+
+class SimulatedClock:
+    """Stand-in for time.time whose value only moves when told to."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ReplayAPICaller(APICaller):
+    """APICaller that serves recorded ticks instead of talking to the client.
+
+    The replay driver loads a tick before each update; endpoints with nothing
+    new that tick behave exactly like an unchanged live payload, and ones
+    recorded as unreachable like a client that is not running.
+    """
+
+    def __init__(self, time_source=None):
+        super().__init__(None, None, concurrent=False, time_source=time_source or SimulatedClock())
+        self.payloads = {}
+
+    def load_tick(self, tick):
+        self.payloads = tick[1]
+
+    def _get_json(self, endpoint, link, label):
+        payload = self.payloads.get(endpoint)
+        if payload is None and None in self.payloads.values():
+            # The client was down on this tick, so anything replay requests that the live
+            # tick skipped has to fail too or the circuit breaker never sees the outage
+            self._note_unreachable(endpoint, label, ConnectionError("client was unreachable when recorded"))
+            return None
+        if payload is None:
+            return UNCHANGED
+        self._fingerprints[endpoint] = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+        return self._parse(endpoint, payload)
+
+
+class ScenarioAPICaller(APICaller):
+    """APICaller that answers from a scripted emulator scenario on simulated time.
+
+    Unlike a recorded session, what the tracker sees depends on which
+    endpoints it asks for and when, so the poll scheduler, the circuit breaker
+    and the transition estimates all run for real.
+    """
+
+    def __init__(self, steps, data_folder="Data", time_source=None):
+        super().__init__(None, None, concurrent=False, time_source=time_source or SimulatedClock())
+        self.steps = steps
+        self.starter_decks = load_json(os.path.join(data_folder, "static_deck_list.json"), {})
+        self.started = self.time_source()
+
+    def _get_json(self, endpoint, link, label):
+        s = step_at(self.steps, self.time_source() - self.started)
+        if s["state"] is None:
+            self._note_unreachable(endpoint, label, ConnectionError("client not running"))
+            return None
+        content = json.dumps(scenario_payload(s, urlsplit(link).path, self.starter_decks)).encode("utf-8")
+        return self._decode(endpoint, label, 200, content)
+
+
+def simulate_scenario(steps, data_folder="Data", quiet=True, recorder=None, **tracker_options):
+    """Run LoRTimers' own tick loop against a scripted scenario on simulated time and return it.
+
+    The clock jumps straight to each scheduled tick, so an hour of play takes
+    milliseconds. `tracker_options` go to LoRTimers (journal, split_tracker, ...).
+    """
+    api = ScenarioAPICaller(steps, data_folder)
+    api.recorder = recorder
+    end = api.started + sum(s["duration"] for s in steps)
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext():
+        game = LoRTimers(api, threading.Event(), data_folder, time_source=api.time_source, **tracker_options)
+        while api.time_source.now < end:
+            game.begin_tick()
+            game.update_game_state()
+            api.time_source.now += game.end_tick()
+    return game
+
+
+def replay_session(ticks, data_folder="Data", quiet=True, game=None):
+    """Drive LoRTimers through recorded ticks on simulated time and return it.
+
+    `ticks` can be any iterable, so generated sessions never have to sit in
+    memory all at once. Pass `game` to replay into an existing tracker built on
+    a ReplayAPICaller and SimulatedClock.
+    """
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext():
+        if game is None:
+            api = ReplayAPICaller()
+            game = LoRTimers(api, threading.Event(), data_folder, time_source=api.time_source)
+        for tick in ticks:
+            game.time_source.now = tick[0]
+            game.api_caller.load_tick(tick)
+            game.update_game_state()
+    return game
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded LoR client session.")
+    parser.add_argument("session", help="Session file written with LoR_Timers.py --record")
+    parser.add_argument("--verbose", action="store_true", help="Show the tracker's log output")
+    args = parser.parse_args()
+
+    if args.verbose:
+        from log_service import LogService
+        # Replays run far faster than real time, so don't collapse repeats
+        log_service = LogService("DEBUG", repeat_interval=0).start()
+    ticks = load_session(args.session)
+    started = time.perf_counter()
+    game = replay_session(ticks, quiet=not args.verbose)
+    elapsed = time.perf_counter() - started
+
+    print(f"Replayed {len(ticks)} ticks in {elapsed * 1000:.1f} ms")
+    print(f"Menu time: {game.total_menu_time:.2f} sec")
+    for champion, runs in game.game_durations.items():
+        print(f"{champion}: {[round(run['duration'], 2) for run in runs]}")
+    if args.verbose:
+        log_service.stop()
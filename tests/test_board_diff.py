@@ -0,0 +1,45 @@
+from board_diff import DRAWN, PLAYED, REMOVED, BoardDiff, SplitTracker
+
+SCREEN = {"ScreenWidth": 1920, "ScreenHeight": 1000}
+LOCAL_HAND, LOCAL_BOARD, OPPONENT_BOARD, OPPONENT_HAND = 50, 400, 700, 1000
+
+
+def card(card_id, y, local=True, code=None):
+    return {"CardID": card_id, "CardCode": code or f"01SI{card_id:03d}", "TopLeftY": y, "Height": 100,
+            "LocalPlayer": local}
+
+
+def kinds(events):
+    return sorted((kind, card_id) for kind, card_id, _, _ in events)
+
+
+def test_draws_plays_and_removals_are_told_apart():
+    board = BoardDiff()
+    face = {"CardID": 99, "CardCode": "face", "TopLeftY": 500, "Height": 100, "LocalPlayer": True}
+    assert kinds(board.update([card(1, LOCAL_HAND), card(2, OPPONENT_HAND, local=False), face], 1000)) == \
+        [(DRAWN, 1), (DRAWN, 2)]
+    # The local card goes from hand to board, the opponent plays straight onto the board
+    assert kinds(board.update([card(1, LOCAL_BOARD), card(2, OPPONENT_HAND, local=False),
+                               card(3, OPPONENT_BOARD, local=False)], 1000)) == [(PLAYED, 1), (PLAYED, 3)]
+    # Moving around the board is not a play; leaving it is a removal, leaving the hand a play
+    assert kinds(board.update([card(1, LOCAL_BOARD + 20)], 1000)) == [(PLAYED, 2), (REMOVED, 3)]
+    assert board.update([card(1, LOCAL_BOARD + 20)], 1000) == []
+
+
+def test_rounds_start_when_both_players_draw():
+    splits = SplitTracker()
+    splits.start(0.0)
+    hands = [card(1, LOCAL_HAND), card(2, OPPONENT_HAND, local=False)]
+    splits.update({"Screen": SCREEN, "Rectangles": hands}, 1.0)  # the mulligan, too early for a new round
+    splits.update({"Screen": SCREEN, "Rectangles": [card(1, LOCAL_BOARD), hands[1]]}, 4.0)
+    splits.update({"Screen": SCREEN, "Rectangles": [card(1, LOCAL_BOARD), hands[1], card(3, LOCAL_HAND)]}, 10.0)
+    splits.update({"Screen": SCREEN, "Rectangles": [card(1, LOCAL_BOARD), hands[1], card(3, LOCAL_HAND),
+                                                    card(4, OPPONENT_HAND, local=False)]}, 11.0)
+    splits.update({"Screen": SCREEN, "Rectangles": [card(1, LOCAL_BOARD), hands[1], card(3, LOCAL_BOARD),
+                                                    card(4, OPPONENT_HAND, local=False)]}, 14.5)
+
+    first, second = splits.finish(20.0)
+    assert (first["start"], first["duration"]) == (0.0, 11.0)
+    assert first["actions"] == [{"card": "01SI001", "at": 4.0, "split": 4.0}]
+    assert (second["start"], second["duration"]) == (11.0, 9.0)
+    assert second["actions"] == [{"card": "01SI003", "at": 3.5, "split": 3.5}]
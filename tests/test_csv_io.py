@@ -0,0 +1,60 @@
+import queue
+
+from csv_io import CsvWorker, run_key
+
+
+def finish(worker):
+    """Wait for the worker and return (imported runs, final message)."""
+    worker.thread.join(timeout=5)
+    runs, final = [], None
+    while True:
+        try:
+            kind, payload = worker.messages.get_nowait()
+        except queue.Empty:
+            return runs, final
+        if kind == "chunk":
+            runs.extend(payload)
+        elif kind in ("done", "error"):
+            final = (kind, payload)
+
+
+def test_export_then_import_skips_runs_already_in_the_history(tmp_path):
+    path = str(tmp_path / "runs.csv")
+    history = {"Elise": [{"duration": 300.5, "game_id": 3, "timestamp": "2024-01-01T10:00:00", "error": 0.25},
+                         {"duration": 420.0, "game_id": 4, "timestamp": "2024-01-01T11:00:00"}],
+               "Ahri": [{"duration": 610.0, "game_id": None}]}
+    worker = CsvWorker(chunk_size=2)
+    worker.start_export(path, history)
+    assert finish(worker)[1] == ("done", f"Saved 3 runs to {path}")
+
+    existing = [run_key("Elise", history["Elise"][0])]
+    worker.start_import(path, existing)
+    runs, (kind, summary) = finish(worker)
+    assert kind == "done"
+    assert "1 duplicates" in summary
+    assert runs == [("Elise", {"duration": 420.0, "game_id": 4, "timestamp": "2024-01-01T11:00:00"}),
+                    ("Ahri", {"duration": 610.0, "game_id": None})]
+
+
+def test_headerless_legacy_file_imports_every_row(tmp_path):
+    path = tmp_path / "legacy.csv"
+    path.write_text("Elise,300,1\nAhri,5:00,2\nbroken row,,\n", encoding="utf-8")
+    worker = CsvWorker()
+    worker.start_import(str(path), [])
+    runs, (kind, summary) = finish(worker)
+    assert kind == "done"
+    assert "1 unreadable rows skipped" in summary
+    assert runs == [("Elise", {"duration": 300.0, "game_id": 1}), ("Ahri", {"duration": 300.0, "game_id": 2})]
+
+
+def test_worker_always_finishes_with_done_or_error(tmp_path):
+    path = tmp_path / "odd.csv"
+    path.write_text("Champion,Duration,GameID\nElise,300,inf\n", encoding="utf-8")
+    worker = CsvWorker()
+    worker.start_import(str(path), [])
+    runs, final = finish(worker)
+    assert final[0] == "done"
+    assert runs == [("Elise", {"duration": 300.0, "game_id": "inf"})]
+
+    worker.start_export(str(tmp_path / "out.csv"), {"Elise": [{"game_id": 1}]})  # no duration: KeyError
+    assert finish(worker)[1] == ("error", "KeyError: 'duration'")
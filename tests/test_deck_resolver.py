@@ -0,0 +1,12 @@
+import os
+
+from conftest import DATA_FOLDER
+from deck_resolver import DeckResolver, load_json
+
+
+def test_resolving_never_builds_the_card_store():
+    starter_decks = load_json(os.path.join(DATA_FOLDER, "static_deck_list.json"), {})
+    resolver = DeckResolver({}, DATA_FOLDER)
+    assert resolver.resolve(starter_decks["Ahri"]["CardsInDeck"]) == "Ahri"
+    assert resolver._card_store is None
+    assert len(resolver.card_store) == len(resolver.card_index)
@@ -0,0 +1,60 @@
+import json
+import threading
+
+import pytest
+
+from api_caller import APICaller, decode_fields
+from board_diff import SplitTracker
+from conftest import DATA_FOLDER
+from LoR_Timers import LoRTimers
+from session_replay import ReplayAPICaller
+
+BOARD = {"PlayerName": "me", "OpponentName": "them", "GameState": "InProgress",
+         "Screen": {"ScreenWidth": 1920, "ScreenHeight": 1080},
+         "Rectangles": [{"CardID": 1, "CardCode": "01SI053", "TopLeftX": 10, "TopLeftY": 20,
+                         "Width": 100, "Height": 150, "LocalPlayer": True}]}
+
+
+@pytest.mark.parametrize("text", [json.dumps(BOARD), json.dumps(BOARD, indent=4), " \n\t" + json.dumps(BOARD) + "\r\n"],
+                         ids=["compact", "indented", "padded"])
+def test_only_wanted_fields_are_returned(text):
+    assert decode_fields(text, ("GameState", "Screen")) == {"GameState": "InProgress", "Screen": BOARD["Screen"]}
+
+
+def test_field_after_rectangles_is_still_found():
+    text = json.dumps({"Rectangles": BOARD["Rectangles"], "GameState": "Menus"})
+    assert decode_fields(text, ("GameState",)) == {"GameState": "Menus"}
+
+
+def test_empty_object_and_missing_fields():
+    assert decode_fields("{ }", ("GameState",)) == {}
+    assert decode_fields('{"PlayerName": null}', ("GameState",)) == {}
+
+
+def test_non_objects_are_decoded_in_full():
+    assert decode_fields("[1, 2]", ("GameState",)) == [1, 2]
+
+
+@pytest.mark.parametrize("text", ['{"GameState" "Menus"}', '{"GameState": "Menus" "Screen": 1}', "{GameState: 1}",
+                                  '{"GameState": '])
+def test_malformed_payloads_raise_value_error(text):
+    with pytest.raises(ValueError):
+        decode_fields(text, ("GameState", "Screen"))
+
+
+def test_malformed_payload_is_a_fetch_error_not_a_crash():
+    api = ReplayAPICaller()
+    api.subscribe_fields(APICaller.GAME_DATA, object(), ("GameState",))
+    assert api._decode(APICaller.GAME_DATA, "game data", 200, b'{"GameState" "Menus"}') is None
+
+
+def test_rectangles_are_only_decoded_for_the_split_tracker():
+    content = json.dumps(BOARD).encode("utf-8")
+    api = ReplayAPICaller()
+    LoRTimers(api, threading.Event(), DATA_FOLDER, time_source=api.time_source)
+    assert api._parse(APICaller.GAME_DATA, content) == {"GameState": "InProgress"}
+
+    api = ReplayAPICaller()
+    LoRTimers(api, threading.Event(), DATA_FOLDER, time_source=api.time_source, split_tracker=SplitTracker())
+    wanted = ("GameState", "Screen", "Rectangles")
+    assert api._parse(APICaller.GAME_DATA, content) == {key: BOARD[key] for key in wanted}
@@ -0,0 +1,33 @@
+import logging
+
+from log_service import RATE_LIMITED, REPEAT_BY_TEMPLATE, RepeatFilter
+
+
+def record(msg, *args, **extra):
+    record = logging.LogRecord("lor.tracker", logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_same_template_with_different_arguments_is_not_a_repeat():
+    repeats = RepeatFilter(interval=10, clock=lambda: 0.0)
+    assert repeats.filter(record("Error fetching %s: %s", "deck", "timed out", **RATE_LIMITED))
+    assert repeats.filter(record("Error fetching %s: %s", "game data", "timed out", **RATE_LIMITED))
+    assert not repeats.filter(record("Error fetching %s: %s", "game data", "timed out", **RATE_LIMITED))
+
+
+def test_only_rate_limited_messages_are_dropped():
+    repeats = RepeatFilter(interval=10, clock=lambda: 0.0)
+    assert repeats.filter(record("Menu timer started."))
+    assert repeats.filter(record("Menu timer started."))
+
+
+def test_counter_messages_repeat_by_template():
+    now = [0.0]
+    repeats = RepeatFilter(interval=10, clock=lambda: now[0])
+    assert repeats.filter(record("Deck is missing (%d loops).", 1, **REPEAT_BY_TEMPLATE))
+    assert not repeats.filter(record("Deck is missing (%d loops).", 2, **REPEAT_BY_TEMPLATE))
+    now[0] = 11.0
+    let_through = record("Deck is missing (%d loops).", 3, **REPEAT_BY_TEMPLATE)
+    assert repeats.filter(let_through)
+    assert let_through.getMessage() == "Deck is missing (3 loops). (1 similar suppressed)"
@@ -0,0 +1,37 @@
+from personal_best import PersonalBests
+
+
+def split_run(*games):
+    return {"duration": sum(games), "splits": [[{"round": 1, "start": 0.0, "duration": game, "actions": []}]
+                                               for game in games]}
+
+
+def test_runs_without_splits_do_not_feed_sum_of_best():
+    bests = PersonalBests.from_durations({"Elise": [split_run(50.0, 300.0), {"duration": 280.0}]})
+    table = bests.get("Elise")
+    assert table.pb == 280.0
+    assert table.sum_of_best is None  # the PB has no splits to compare against
+    assert table.pb_cumulative == [280.0]
+
+
+def test_sum_of_best_uses_the_best_game_of_each_split_run():
+    bests = PersonalBests.from_durations({"Elise": [split_run(100.0, 200.0), {"duration": 320.0},
+                                                    split_run(120.0, 150.0)]})
+    table = bests.get("Elise")
+    assert table.pb == 270.0
+    assert table.pb_cumulative == [120.0, 270.0]
+    assert table.sum_of_best == 250.0
+
+
+def test_delta_compares_against_the_pb_at_the_same_point():
+    table = PersonalBests.from_durations({"Elise": [split_run(100.0, 200.0)]}).get("Elise")  # splits at 100, 300
+    # Early in the first game nothing has been gained or lost yet
+    assert table.delta(10.0) == 0.0
+    # Past the PB's first split the loss shows live
+    assert table.delta(130.0) == 30.0
+    # Lost the first game at 90: 10 ahead, and that holds while the second game is under way
+    assert table.delta(90.0, segment=1, segment_start=90.0) == -10.0
+    assert table.delta(250.0, segment=1, segment_start=90.0) == -10.0
+    assert table.delta(320.0, segment=1, segment_start=90.0) == 20.0
+    # A run with more games than the PB is compared against the PB's final time
+    assert table.delta(400.0, segment=2, segment_start=350.0) == 100.0
@@ -0,0 +1,52 @@
+import time
+
+from client_emulator import ClientEmulator, adventure_scenario
+from conftest import DATA_FOLDER
+from event_bus import EventBus, TimersChanged
+from poller_process import SEQUENCE, PollerProcess, TimerStateBlock
+
+
+def test_block_round_trip():
+    block = TimerStateBlock.create()
+    try:
+        block.write(100.0, 12.5, None, 3.0, 1, 40.0, "InProgress", "Elise")
+        sequence, timers, game_state, champion = block.read()
+        assert sequence == block.sequence
+        assert timers == TimersChanged(100.0, 12.5, None, 3.0, 1, 40.0)
+        assert (game_state, champion) == ("InProgress", "Elise")
+    finally:
+        block.close()
+
+
+def test_read_gives_up_on_a_write_that_never_finished():
+    block = TimerStateBlock.create()
+    try:
+        SEQUENCE.pack_into(block.shm.buf, 0, block.sequence + 1)  # writer died mid-write
+        started = time.perf_counter()
+        assert block.read() is None
+        assert time.perf_counter() - started < 0.1
+    finally:
+        block.close()
+
+
+def test_fetch_metrics_are_forwarded_from_the_poller(tmp_path):
+    emulator = ClientEmulator(adventure_scenario(), port=0, data_folder=DATA_FOLDER)
+    emulator.start()
+    poller = PollerProcess(EventBus(), base_url=emulator.base_url, data_folder=DATA_FOLDER,
+                           journal=str(tmp_path / "runs.json"))
+    try:
+        poller.start()
+        assert poller.metrics() is None  # asked for, not here yet
+        deadline = time.monotonic() + 10
+        snapshot = None
+        while time.monotonic() < deadline:
+            poller.poll()
+            snapshot = poller.metrics()
+            if snapshot and snapshot["fetch.game_data.latency"]["count"]:
+                break
+            time.sleep(0.05)
+        assert snapshot["fetch.game_data.latency"]["count"] > 0
+        assert "loop.tick_duration" in snapshot
+    finally:
+        poller.stop()
+        emulator.stop()
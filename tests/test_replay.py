@@ -0,0 +1,112 @@
+import pytest
+
+from client_emulator import NO_GAME_RESULT, adventure_scenario, step
+from board_diff import SplitTracker
+from conftest import DATA_FOLDER
+from event_bus import ChampionDetected, EventBus, TimersChanged
+from session_replay import SessionRecorder, load_session, replay_session, simulate_scenario
+
+
+def result(game_id, won):
+    return {"GameID": game_id, "LocalPlayerWon": won}
+
+
+def play(champion, game_id, won, game_length=20.0, previous=NO_GAME_RESULT):
+    """One game of a run: the game itself, the victory/defeat screen (no deck), then the map."""
+    return [step(game_length, "InProgress", champion, previous, rectangles=12),
+            step(3.0, "Menus", None, result(game_id, won)),
+            step(5.0, "Menus", champion, result(game_id, won))]
+
+
+def durations(game):
+    return {champion: [round(run["duration"]) for run in runs] for champion, runs in game.game_durations.items()}
+
+
+def outage_mid_game():
+    """A single won game with the client gone for ten minutes in the middle of it."""
+    return [step(5.0, "Menus", "Elise"),
+            step(30.0, "InProgress", "Elise", NO_GAME_RESULT, rectangles=12),
+            step(600.0, None),
+            step(30.0, "InProgress", "Elise", NO_GAME_RESULT, rectangles=12),
+            step(3.0, "Menus", None, result(0, True)),
+            step(5.0, "Menus", "Elise", result(0, True))]
+
+
+def test_win_loss_win_saves_both_runs_with_the_loss_carried():
+    # Long enough games that the scheduler has backed off game-result by the time each one ends
+    game = simulate_scenario(adventure_scenario(game_length=20.0), DATA_FOLDER)
+    runs = game.game_durations["Elise"]
+    assert [run["game_id"] for run in runs] == [0, 2]
+    assert [round(run["duration"]) for run in runs] == [20, 40]
+    assert [round(run["carried"]) for run in runs] == [0, 20]
+    # The scenario ends by leaving the adventure
+    assert game.current_champion is None
+    assert game.champion_duration == 0
+    assert game.menu_start_time is not None
+
+
+def test_polling_backs_off_after_leaving_the_adventure():
+    game = simulate_scenario(adventure_scenario() + [step(600.0, "Menus", None, result(2, True))], DATA_FOLDER)
+    assert game.current_champion is None
+    assert game.deck_missing_count == 0
+    assert not game.needs_fast_polling()
+    assert game.scheduler.interval(game.time_source()) > game.scheduler.burst_interval
+
+@pytest.mark.parametrize("steps, expected", [
+    ([step(5.0, "Menus", "Elise")] + play("Elise", 0, True), [20]),
+    (outage_mid_game(), [58]),
+], ids=["plain", "outage"])
+def test_recorded_session_replays_to_the_same_runs(tmp_path, steps, expected):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorder = SessionRecorder(path)
+    live = simulate_scenario(steps, DATA_FOLDER, recorder=recorder)
+    recorder.close()
+
+    replayed = replay_session(load_session(path), DATA_FOLDER)
+    assert durations(replayed) == durations(live) == {"Elise": expected}
+    # Replay re-times ticks from the recorded stamps, so menu time can drift by a tick
+    assert replayed.total_menu_time == pytest.approx(live.total_menu_time, abs=1)
+
+
+def test_client_outage_mid_game_is_paused_not_carried():
+    game = simulate_scenario(outage_mid_game(), DATA_FOLDER)
+    run, = game.game_durations["Elise"]
+    assert run["carried"] == 0
+    assert run["duration"] == pytest.approx(60, abs=run["error"])
+    assert run["error"] < 5
+
+
+def test_client_outage_in_the_menus_is_not_menu_time():
+    steps = [step(5.0, "Menus", "Elise"), step(300.0, None), step(5.0, "Menus", "Elise")] + play("Elise", 0, True)
+    game = simulate_scenario(steps, DATA_FOLDER)
+    assert durations(game) == {"Elise": [20]}
+    assert game.game_durations["Elise"][0]["carried"] == 0
+    assert game.total_menu_time < 20
+
+
+def test_leaving_the_adventure_after_a_loss_saves_nothing():
+    steps = [step(5.0, "Menus", "Elise")] + play("Elise", 0, False) + [step(10.0, "Menus", None, result(0, False))]
+    game = simulate_scenario(steps, DATA_FOLDER)
+    assert game.game_durations == {}
+    assert game.current_champion is None
+    assert game.champion_duration == 0
+
+
+def test_leaving_after_a_loss_starts_the_next_champion_from_scratch():
+    steps = ([step(5.0, "Menus", "Elise")] + play("Elise", 0, False)
+             + [step(10.0, "Menus", None, result(0, False)), step(5.0, "Menus", "Ahri", result(0, False))]
+             + play("Ahri", 1, True, previous=result(0, False)))
+    bus = EventBus()
+    events = bus.subscribe()
+    seen = []
+    events.on(ChampionDetected, lambda event: seen.append(event.champion))
+    events.on(TimersChanged, lambda event: seen.append(event.segment))
+    game = simulate_scenario(steps, DATA_FOLDER, split_tracker=SplitTracker(), event_bus=bus)
+    events.dispatch()
+    assert "Elise" not in game.game_durations
+    run, = game.game_durations["Ahri"]
+    assert round(run["duration"]) == 20
+    assert run["carried"] == 0
+    assert len(run["splits"]) == 1
+    # The PB delta compares Ahri's first game against the first split
+    assert set(seen[seen.index("Ahri") + 1:]) == {0}
@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+
+from conftest import DATA_FOLDER
+from event_bus import EventBus, RunsImported
+from LoR_Timers import LoRTimers
+from run_journal import RunJournal
+from session_replay import ReplayAPICaller, replay_session
+
+
+def wait_for_lines(path, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with open(path, "rb") as f:
+            if f.read().count(b"\n") >= count:
+                return
+        time.sleep(0.01)
+    raise AssertionError(f"journal never reached {count} lines")
+
+
+def durations(game_durations):
+    return {champion: [run["duration"] for run in runs] for champion, runs in game_durations.items()}
+
+
+def test_run_written_after_a_torn_tail_survives_a_crash(tmp_path):
+    snapshot = str(tmp_path / "runs.json")
+    journal = RunJournal(snapshot, batch_interval=0.01)
+    with open(journal.journal_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"champion": "Elise", "duration": 1.0, "seq": 1}) + "\n")
+        f.write('{"champion": "Elise", "dura')  # crashed mid-write
+    assert durations(journal.load()) == {"Elise": [1.0]}
+
+    journal.append("Elise", {"duration": 2.0})
+    wait_for_lines(journal.journal_path, 2)  # synced, then the process dies without compacting
+
+    assert durations(RunJournal(snapshot).load()) == {"Elise": [1.0, 2.0]}
+    journal.close()
+
+
+def test_crash_between_snapshot_and_truncate_does_not_duplicate_runs(tmp_path):
+    snapshot = str(tmp_path / "runs.json")
+    runs = [{"duration": 1.0, "seq": 1}, {"duration": 2.0, "seq": 2}]
+    with open(snapshot, "w", encoding="utf-8") as f:
+        json.dump({"Elise": runs}, f)
+    journal = RunJournal(snapshot, batch_interval=0.01)
+    with open(journal.journal_path, "w", encoding="utf-8") as f:
+        for run in runs:  # the snapshot already holds these, the truncate never happened
+            f.write(json.dumps({"champion": "Elise", **run}) + "\n")
+    assert durations(journal.load()) == {"Elise": [1.0, 2.0]}
+
+    journal.append("Elise", {"duration": 3.0})
+    journal.close()
+    assert durations(RunJournal(snapshot).load()) == {"Elise": [1.0, 2.0, 3.0]}
+
+
+def test_imported_runs_are_journaled(tmp_path):
+    snapshot = str(tmp_path / "runs.json")
+    bus = EventBus()
+    events = bus.subscribe()
+    api = ReplayAPICaller()
+    game = LoRTimers(api, threading.Event(), DATA_FOLDER, journal=RunJournal(snapshot, batch_interval=0.01),
+                     time_source=api.time_source, event_bus=bus)
+    game.import_runs([("Ahri", {"duration": 300.0, "game_id": None})])
+    replay_session([(1.0, {})], game=game)
+    game.journal.close()
+
+    assert [type(event) for event in events.drain()].count(RunsImported) == 1
+    assert durations(RunJournal(snapshot).load()) == {"Ahri": [300.0]}
+    assert game.champion_stats.to_dict()["Ahri"]
+
+
+def test_last_game_duration_survives_a_clean_restart(tmp_path):
+    snapshot = str(tmp_path / "runs.json")
+    api = ReplayAPICaller()
+    game = LoRTimers(api, threading.Event(), DATA_FOLDER, journal=RunJournal(snapshot, batch_interval=0.01),
+                     time_source=api.time_source)
+    game.import_runs([("Ahri", {"duration": 300.0, "game_id": None}), ("Elise", {"duration": 240.0, "game_id": None})])
+    replay_session([(1.0, {})], game=game)
+    game.journal.close()  # compacts, so every run is in the saved stats
+
+    api = ReplayAPICaller()
+    restarted = LoRTimers(api, threading.Event(), DATA_FOLDER, journal=RunJournal(snapshot),
+                          time_source=api.time_source)
+    restarted.journal.close()
+    assert restarted.champion_stats.last_duration == 240.0
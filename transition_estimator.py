@@ -0,0 +1,42 @@
+class TransitionEstimator:
+    """Estimates when a change really happened between two polls.
+
+    For every endpoint it keeps the window (request sent, response received)
+    of the latest successful poll. When a poll shows a change, the change
+    happened after the previous poll was sent and before this one was
+    answered; the estimate is the middle of that bracket and the error bound
+    is half its width. Estimates never go backwards, so consecutive splits
+    stay ordered even when brackets overlap.
+    """
+
+    def __init__(self):
+        self.previous = {}
+        self.current = {}
+        self.last_estimate = None
+
+    def observe(self, key, window):
+        """Record the (sent, received) window of a successful poll of `key`."""
+        if key in self.current:
+            self.previous[key] = self.current[key]
+        self.current[key] = window
+
+    def forget(self):
+        """Drop every window so nothing seen so far brackets a later change."""
+        self.previous.clear()
+        self.current.clear()
+
+    def estimate(self, key):
+        """Return (timestamp, error bound) for a change first seen on the latest poll of `key`."""
+        current = self.current.get(key)
+        if current is None:
+            return None
+        previous = self.previous.get(key)
+        lower = previous[0] if previous else current[0]
+        upper = current[1]
+
+        timestamp = (lower + upper) / 2
+        error = (upper - lower) / 2
+        if self.last_estimate is not None and timestamp < self.last_estimate:
+            timestamp = min(self.last_estimate, upper)
+        self.last_estimate = timestamp
+        return timestamp, error